@@ -4,10 +4,13 @@ Permet d'éviter de retraiter les images inchangées.
 """
 
 import hashlib
+import io
 import json
 import logging
 import os
+import sys
 import xxhash
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional, Set, Tuple, Union
@@ -36,7 +39,16 @@ class ImageCache:
         """
         self.cache_file = Path(cache_file) if cache_file else None
         self.cache: Dict[str, Dict] = {"version": CACHE_VERSION, "entries": {}}
+        # Méta-cache (chemin, taille, mtime) -> empreinte, persisté dans un
+        # fichier annexe pour éviter de re-hacher les fichiers inchangés
+        self.meta_file = (
+            self.cache_file.with_suffix(self.cache_file.suffix + ".meta")
+            if self.cache_file
+            else None
+        )
+        self.meta: Dict[str, str] = {}
         self._load_cache()
+        self._load_meta()
 
     def _load_cache(self) -> None:
         """Charge le cache depuis le fichier s'il existe."""
@@ -79,6 +91,120 @@ class ImageCache:
         except IOError as e:
             logger.error(f"Erreur lors de la sauvegarde du cache: {e}")
 
+    def _load_meta(self) -> None:
+        """Charge le méta-cache depuis le fichier annexe s'il existe."""
+        if not self.meta_file or not self.meta_file.exists():
+            return
+
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                self.meta = json.load(f)
+            logger.debug(
+                f"Méta-cache chargé depuis {self.meta_file} avec {len(self.meta)} entrées"
+            )
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(
+                f"Impossible de charger le méta-cache depuis {self.meta_file}: {e}"
+            )
+
+    def _save_meta(self) -> None:
+        """Sauvegarde le méta-cache dans le fichier annexe."""
+        if not self.meta_file:
+            return
+
+        try:
+            self.meta_file.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(self.meta_file, "w", encoding="utf-8") as f:
+                json.dump(self.meta, f, indent=2)
+
+            logger.debug(f"Méta-cache sauvegardé dans {self.meta_file}")
+
+        except IOError as e:
+            logger.error(f"Erreur lors de la sauvegarde du méta-cache: {e}")
+
+    def cached_file_hash(
+        self,
+        file_path: Union[str, Path],
+        save: bool = True,
+        fileobj: Optional[Any] = None,
+    ) -> str:
+        """
+        Retourne l'empreinte d'un fichier en évitant de le re-hacher.
+
+        La clé du méta-cache combine le chemin résolu, la taille et le
+        mtime en nanosecondes : tant que ce triplet est inchangé, un simple
+        stat() remplace la lecture complète du fichier.
+
+        Args:
+            file_path: Chemin vers le fichier
+            save: Si True, persiste le méta-cache après un ajout
+            fileobj: Objet fichier déjà ouvert sur file_path (optionnel),
+                transmis à calculate_file_hash en cas de défaut de cache
+
+        Returns:
+            Chaîne hexadécimale représentant l'empreinte du fichier
+        """
+        file_path = Path(file_path).resolve()
+        st = file_path.stat()
+        meta_key = f"{file_path}|{st.st_size}|{st.st_mtime_ns}"
+
+        cached = self.meta.get(meta_key)
+        if cached is not None:
+            logger.debug(f"[CACHE] Empreinte trouvée dans le méta-cache: {file_path}")
+            return cached
+
+        file_hash = self.calculate_file_hash(file_path, fileobj=fileobj)
+        self.meta[meta_key] = file_hash
+        if save:
+            self._save_meta()
+        return file_hash
+
+    def hash_files(
+        self,
+        file_paths: Union[list, tuple],
+        max_workers: Optional[int] = None,
+    ) -> Dict[Path, str]:
+        """
+        Calcule les empreintes d'un lot de fichiers en parallèle.
+
+        hashlib relâche le GIL pendant le calcul sur les gros tampons :
+        hacher N fichiers indépendants dans un pool de threads exploite
+        donc réellement plusieurs cœurs, en plus de recouvrir les
+        lectures disque.
+
+        Args:
+            file_paths: Chemins des fichiers à hacher
+            max_workers: Nombre de threads (par défaut: 2 x cpu_count,
+                plafonné à 8)
+
+        Returns:
+            Dictionnaire chemin -> empreinte (les fichiers illisibles
+            sont omis)
+        """
+        if max_workers is None:
+            max_workers = min(8, (os.cpu_count() or 4) * 2)
+
+        paths = [Path(p) for p in file_paths]
+        results: Dict[Path, str] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for path, file_hash in zip(
+                paths, executor.map(self._hash_or_none, paths)
+            ):
+                if file_hash is not None:
+                    results[path] = file_hash
+
+        # Une seule sauvegarde du méta-cache pour tout le lot
+        self._save_meta()
+        return results
+
+    def _hash_or_none(self, file_path: Path) -> Optional[str]:
+        """Variante de cached_file_hash qui absorbe les erreurs d'E/S."""
+        try:
+            return self.cached_file_hash(file_path, save=False)
+        except (IOError, OSError):
+            return None
+
     def generate_key(
         self, source_path: Union[str, Path], params: Optional[Dict] = None
     ) -> str:
@@ -92,8 +218,6 @@ class ImageCache:
         Returns:
             Une chaîne de caractères représentant la clé de cache
         """
-        import hashlib
-
         # Normaliser le chemin source
         source_path = str(Path(source_path).resolve())
 
@@ -114,27 +238,55 @@ class ImageCache:
 
     @staticmethod
     def calculate_file_hash(
-        file_path: Union[str, Path], chunk_size: int = 65536
+        file_path: Union[str, Path],
+        chunk_size: int = 1 << 20,
+        hash_algorithm: str = "sha256",
+        fileobj: Optional[Any] = None,
     ) -> str:
         """
         Calcule une empreinte unique d'un fichier.
 
         Args:
             file_path: Chemin vers le fichier
-            chunk_size: Taille des blocs à lire (en octets)
+            chunk_size: Taille des blocs à lire (en octets, chemin de secours)
+            hash_algorithm: Algorithme de hachage à utiliser
+            fileobj: Objet fichier binaire déjà ouvert sur file_path
+                (optionnel) : évite un open() supplémentaire quand
+                l'appelant tient déjà le descripteur
 
         Returns:
             Chaîne hexadécimale représentant l'empreinte du fichier (64 caractères hexadécimaux)
         """
-        import hashlib
-
         file_path = Path(file_path)
-        hasher = hashlib.sha256()
 
-        try:
-            with open(file_path, "rb") as f:
+        def _digest(f: Any) -> "hashlib._Hash":
+            # file_digest exige un véritable objet fichier binaire
+            if sys.version_info >= (3, 11) and isinstance(f, io.BufferedIOBase):
+                # file_digest lit via un tampon interne réutilisé et
+                # laisse OpenSSL exploiter les instructions SHA-NI
+                return hashlib.file_digest(f, hash_algorithm)
+            hasher = hashlib.new(hash_algorithm)
+            if isinstance(f, io.IOBase):
+                # readinto remplit un tampon réutilisé : une seule
+                # allocation par fichier au lieu d'un objet bytes par bloc
+                buf = bytearray(chunk_size)
+                view = memoryview(buf)
+                while n := f.readinto(buf):
+                    hasher.update(view[:n])
+            else:
+                # Objets pseudo-fichiers (mocks, wrappers) : lecture par
+                # blocs classique
                 while chunk := f.read(chunk_size):
                     hasher.update(chunk)
+            return hasher
+
+        try:
+            if fileobj is not None:
+                fileobj.seek(0)
+                hasher = _digest(fileobj)
+            else:
+                with open(file_path, "rb") as f:
+                    hasher = _digest(f)
 
             # Ajouter la taille et la date de modification pour détecter les changements
             stat = file_path.stat()
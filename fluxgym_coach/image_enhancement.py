@@ -4,10 +4,16 @@ Permet d'augmenter la résolution des images via une API Stable Diffusion.
 """
 
 import base64
+import binascii
+import datetime
+import hashlib
 import io
 import json
 import logging
+import os
 import random
+import shutil
+import string
 import time
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple, Union, List, BinaryIO
@@ -15,6 +21,7 @@ from urllib.error import URLError
 from io import BytesIO
 
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from PIL import Image, ImageFile
 
 # Configuration du logger
@@ -33,6 +40,36 @@ except AttributeError:
 MIN_WIDTH = 1024  # Largeur minimale pour le redimensionnement
 SUPPORTED_FORMATS = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tiff"}
 
+# Taille des blocs décodés lors de l'écriture en flux des images base64
+# (bornée pour éviter d'allouer le tampon décodé complet de chaque image)
+_DECODE_CHUNK_SIZE = 1 << 20
+
+
+def _summarize_response(response: Dict[str, Any], max_str_len: int = 200) -> Dict[str, Any]:
+    """
+    Résume une réponse API pour les messages d'erreur.
+
+    Évite de sérialiser des charges utiles complètes (listes d'images en
+    base64) dans les messages d'exception : les listes sont remplacées par
+    leur taille et les longues chaînes sont tronquées.
+
+    Args:
+        response: Réponse de l'API à résumer
+        max_str_len: Longueur maximale des chaînes conservées
+
+    Returns:
+        Dictionnaire résumé, sérialisable en JSON
+    """
+    summary: Dict[str, Any] = {}
+    for key, value in response.items():
+        if isinstance(value, list):
+            summary[key] = f"<{len(value)} éléments>"
+        elif isinstance(value, str) and len(value) > max_str_len:
+            summary[key] = value[:max_str_len] + "…"
+        else:
+            summary[key] = value
+    return summary
+
 class ImageEnhancer:
     """Classe pour améliorer la résolution des images via l'API Stable Diffusion Forge."""
 
@@ -55,7 +92,19 @@ class ImageEnhancer:
         self.use_cache = use_cache
         self.cache = cache if cache is not None else None
         self._processed_paths = set()  # Pour éviter les doublons dans un même traitement
-        self.timeout = 300  # 5 minutes de timeout pour les requêtes
+
+        # Session HTTP réutilisée entre les appels (keep-alive + pool de
+        # connexions) pour éviter une poignée de main TCP par requête ;
+        # les erreurs de connexion transitoires sont retentées avec un
+        # court backoff (les POST non idempotents ne sont pas rejoués)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.2),
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
 
     def _validate_image_path(self, image_path: Union[str, Path]) -> Path:
         """
@@ -153,19 +202,27 @@ class ImageEnhancer:
         """
         buffered = BytesIO()
         image.save(buffered, format=format, quality=95)
-        return base64.b64encode(buffered.getvalue()).decode('utf-8')
+        # Encoder directement la memoryview du tampon pour éviter la copie
+        # intermédiaire de getvalue()
+        return base64.b64encode(buffered.getbuffer()).decode('utf-8')
         
     def decode_image(self, base64_str: str) -> Image.Image:
         """
         Décode une image à partir d'une chaîne base64.
-        
+
         Args:
             base64_str: Image encodée en base64
-            
+
         Returns:
             Image décodée
         """
-        return Image.open(BytesIO(base64.b64decode(base64_str)))
+        # Décodage forcé immédiatement (img.load) : PIL est paresseux et
+        # relirait sinon le tampon base64 décodé à chaque accès aux
+        # pixels, gardant les deux copies vivantes plus longtemps
+        raw = base64.b64decode(base64_str)
+        img = Image.open(BytesIO(raw))
+        img.load()
+        return img
         
     def save_image(
         self, 
@@ -230,7 +287,7 @@ class ImageEnhancer:
                 logger.debug(
                     f"Appel de l'API {endpoint} (tentative {attempt + 1}/{max_retries})"
                 )
-                response = requests.post(
+                response = self._session.post(
                     url,
                     data=json.dumps(payload),
                     headers=headers,
@@ -503,10 +560,13 @@ class ImageEnhancer:
         """
         buffered = io.BytesIO()
         # Toujours convertir en PNG pour éviter les problèmes avec certains formats
-        if image.mode not in ("RGB", "RGBA"):
+        # (le mode L est conservé : PNG 8 bits pour les images en niveaux de gris)
+        if image.mode not in ("RGB", "RGBA", "L"):
             image = image.convert("RGB")
         image.save(buffered, format="PNG", quality=95)
-        return base64.b64encode(buffered.getvalue()).decode("utf-8")
+        # Encoder directement la memoryview du tampon pour éviter la copie
+        # intermédiaire de getvalue()
+        return base64.b64encode(buffered.getbuffer()).decode("utf-8")
 
     def decode_and_save_base64(
         self, base64_str: str, output_path: Union[str, Path], overwrite: bool = False
@@ -528,8 +588,18 @@ class ImageEnhancer:
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
+        encoded = base64_str.encode("ascii")
         with open(output_path, "wb") as file:
-            file.write(base64.b64decode(base64_str))
+            if len(encoded) % 4 == 0 and b"\n" not in encoded:
+                # Décodage en flux par blocs alignés sur 4 caractères :
+                # l'allocation reste bornée par _DECODE_CHUNK_SIZE au lieu
+                # d'un tampon de la taille de l'image décodée
+                mv = memoryview(encoded)
+                step = (_DECODE_CHUNK_SIZE // 3) * 4
+                for start in range(0, len(mv), step):
+                    file.write(binascii.a2b_base64(mv[start:start + step]))
+            else:
+                file.write(base64.b64decode(encoded))
 
     def colorize_image(
         self,
@@ -768,10 +838,10 @@ class ImageEnhancer:
                 logger.debug(f"[PROCESS_SINGLE] Conversion de l'image en mode RGB (était: {image.mode})")
                 image = image.convert("RGB")
 
-            # Encoder l'image pour l'API
+            # Encoder l'image pour l'API (sans copie intermédiaire du tampon)
             buffered = io.BytesIO()
             image.save(buffered, format=output_format, quality=95)
-            encoded_image = base64.b64encode(buffered.getvalue()).decode("utf-8")
+            encoded_image = base64.b64encode(buffered.getbuffer()).decode("utf-8")
             logger.debug(f"[PROCESS_SINGLE] Image encodée en base64, taille: {len(encoded_image)} caractères")
             
             # Ajouter au cache si nécessaire
@@ -1051,6 +1121,11 @@ class ImageEnhancer:
                         ):
                             prompt += ", black and white, monochrome"
 
+                # Les images restées en N&B sont transmises en niveaux de
+                # gris 8 bits : ~3x moins d'octets à encoder et à transférer
+                if is_bw:
+                    processed_img = processed_img.convert("L")
+
                 # Encoder l'image
                 encoded_image = self.encode_image_to_base64(
                     processed_img, output_format
@@ -1079,6 +1154,27 @@ class ImageEnhancer:
         if not images_to_process:
             return results
 
+        # Regrouper les images dont le contenu encodé est identique pour
+        # n'envoyer qu'une seule requête par contenu unique. Les doublons
+        # seront recréés à partir du premier résultat (lien physique ou copie).
+        content_groups: Dict[str, List[Dict[str, Any]]] = {}
+        for img_info in images_to_process:
+            digest = hashlib.sha256(img_info["image"].encode("ascii")).hexdigest()
+            content_groups.setdefault(digest, []).append(img_info)
+
+        unique_to_process: List[Dict[str, Any]] = []
+        duplicate_map: Dict[int, List[Dict[str, Any]]] = {}
+        for members in content_groups.values():
+            unique_to_process.append(members[0])
+            if len(members) > 1:
+                duplicate_map[len(unique_to_process) - 1] = members[1:]
+
+        if duplicate_map:
+            logger.info(
+                f"[BATCH] {len(images_to_process) - len(unique_to_process)} doublons "
+                f"détectés, {len(unique_to_process)} images uniques envoyées à l'API"
+            )
+
         # Préparer la charge utile pour l'API
         # Format basé sur l'implémentation de sdwebuiapi
         payload = {
@@ -1099,7 +1195,7 @@ class ImageEnhancer:
 
         # Préparer la liste des images au format attendu par l'API
         image_list = []
-        for i, img in enumerate(images_to_process):
+        for i, img in enumerate(unique_to_process):
             # Vérifier si l'élément contient une image encodée
             if "image" in img and img["image"] is not None:
                 # Convertir l'image en base64 sans l'en-tête data:image/
@@ -1141,7 +1237,7 @@ class ImageEnhancer:
                 )
 
             logger.info(
-                f"Envoi de la requête de traitement par lots pour {len(images_to_process)} images"
+                f"Envoi de la requête de traitement par lots pour {len(unique_to_process)} images"
             )
 
             # Appel à l'API
@@ -1154,35 +1250,36 @@ class ImageEnhancer:
             if "error" in response:
                 error_msg = response.get("error", "Erreur inconnue")
                 if isinstance(error_msg, dict):
-                    error_msg = json.dumps(error_msg, indent=2)
+                    error_msg = json.dumps(_summarize_response(error_msg))
                 raise ValueError(f"Erreur de l'API: {error_msg}")
 
             if "images" not in response or not response["images"]:
                 raise ValueError("Aucune image retournée dans la réponse")
 
-            if len(response["images"]) != len(images_to_process):
+            if len(response["images"]) != len(unique_to_process):
                 logger.warning(
                     f"Nombre d'images retournées ({len(response['images'])}) "
-                    f"ne correspond pas au nombre d'images envoyées ({len(images_to_process)})"
+                    f"ne correspond pas au nombre d'images envoyées ({len(unique_to_process)})"
                 )
 
             # Traiter les résultats de l'API
             processed_count = 0
+            saved_outputs: List[Path] = []
             # Utiliser le minimum entre le nombre d'images reçues et le nombre d'images attendues
-            num_images_to_process = min(len(response["images"]), len(images_to_process))
+            num_images_to_process = min(len(response["images"]), len(unique_to_process))
             
             logger.debug(f"[BATCH] Nombre d'images à traiter: {num_images_to_process}")
             logger.debug(f"[BATCH] Images reçues: {len(response['images'])}")
-            logger.debug(f"[BATCH] Images attendues: {len(images_to_process)}")
+            logger.debug(f"[BATCH] Images attendues: {len(unique_to_process)}")
             
             for i in range(num_images_to_process):
                 img_data = response["images"][i]
                 # S'assurer que l'index est valide
-                if i >= len(images_to_process):
-                    logger.warning(f"[BATCH] Index {i} hors limites pour images_to_process (taille: {len(images_to_process)})")
+                if i >= len(unique_to_process):
+                    logger.warning(f"[BATCH] Index {i} hors limites pour unique_to_process (taille: {len(unique_to_process)})")
                     continue
                     
-                img_info = images_to_process[i]
+                img_info = unique_to_process[i]
                 logger.debug(f"[BATCH] Traitement de l'image {i+1}/{num_images_to_process}")
                 logger.debug(f"[BATCH] Chemin source: {img_info.get('path')}")
                 logger.debug(f"[BATCH] Chemin de sortie: {img_info.get('output_path')}")
@@ -1247,13 +1344,10 @@ class ImageEnhancer:
                     # Sauvegarder l'image en forçant l'écrasement
                     try:
                         logger.debug(f"[BATCH] Tentative de sauvegarde dans: {output_path}")
-                        if output_path.exists():
-                            logger.debug(f"[BATCH] Le fichier existe déjà, il sera écrasé: {output_path}")
                         self.decode_and_save_base64(
                             img_data, output_path, overwrite=True
                         )
                         logger.debug(f"[BATCH] Image sauvegardée avec succès: {output_path}")
-                        logger.debug(f"[BATCH] Le fichier existe après sauvegarde: {output_path.exists()}")
                     except Exception as save_error:
                         logger.error(f"[BATCH] Échec de la sauvegarde de l'image {output_path}: {save_error}")
                         raise
@@ -1281,16 +1375,49 @@ class ImageEnhancer:
                             logger.debug(
                                 f"[BATCH] Résultat {i+1} (index original: {original_idx}) enregistré: {output_path}"
                             )
-                            # Vérifier que le fichier a bien été créé
-                            if output_path.exists():
-                                logger.debug(f"[BATCH] Fichier de sortie vérifié: {output_path} (taille: {output_path.stat().st_size} octets)")
-                            else:
-                                logger.error(f"[BATCH] ERREUR: Le fichier de sortie n'existe pas: {output_path}")
+                            # La vérification du fichier est différée : un seul
+                            # scandir par répertoire après la boucle
+                            saved_outputs.append(output_path)
                         else:
                             logger.error(f"[BATCH] ERREUR: Index original {original_idx} hors limites (0-{len(results)-1})")
                     else:
                         logger.warning(f"[BATCH] Aucun original_index trouvé pour l'image {i+1}")
-                        
+
+                    # Recréer les doublons de contenu à partir du fichier sauvegardé
+                    for dup_info in duplicate_map.get(i, []):
+                        try:
+                            dup_output = Path(dup_info["output_path"])
+                            dup_output.parent.mkdir(parents=True, exist_ok=True)
+                            if dup_output.exists():
+                                dup_output.unlink()
+                            try:
+                                os.link(output_path, dup_output)
+                            except OSError:
+                                shutil.copy2(output_path, dup_output)
+
+                            if self.use_cache and not skip_cache and self.cache:
+                                try:
+                                    self.cache.add_to_cache(
+                                        dup_info["path"], dup_output, cache_params
+                                    )
+                                except Exception as cache_error:
+                                    logger.error(f"[BATCH] Erreur lors de la mise en cache: {cache_error}")
+
+                            dup_idx = dup_info.get("original_index")
+                            if dup_idx is not None and 0 <= dup_idx < len(results):
+                                results[dup_idx] = (dup_output, dup_info.get("is_bw", False))
+                                self._processed_paths.add(str(dup_info["path"]))
+                            logger.debug(
+                                f"[BATCH] Doublon recréé depuis {output_path}: {dup_output}"
+                            )
+                        except Exception as dup_error:
+                            logger.error(
+                                f"[BATCH] Erreur lors de la duplication vers {dup_info.get('output_path')}: {dup_error}"
+                            )
+                            dup_idx = dup_info.get("original_index")
+                            if dup_idx is not None and 0 <= dup_idx < len(results):
+                                results[dup_idx] = (None, False)
+
                 except Exception as e:
                     logger.error(
                         f"[BATCH] Erreur lors de la sauvegarde de l'image {output_path}: {e}",
@@ -1299,16 +1426,35 @@ class ImageEnhancer:
                     if "original_index" in img_info:
                         results[img_info["original_index"]] = (None, False)
             
-            logger.info(f"[BATCH] {processed_count} images traitées avec succès sur {len(images_to_process)}")
+            # Vérifier les fichiers de sortie en un seul parcours par répertoire :
+            # un scandir amortit le coût des stat() sur l'ensemble du lot
+            stats_by_dir: Dict[Path, Dict[str, os.stat_result]] = {}
+            for out_path in saved_outputs:
+                parent = out_path.parent
+                if parent not in stats_by_dir:
+                    try:
+                        stats_by_dir[parent] = {
+                            entry.name: entry.stat() for entry in os.scandir(parent)
+                        }
+                    except OSError as scan_error:
+                        logger.error(f"[BATCH] Impossible de lister {parent}: {scan_error}")
+                        stats_by_dir[parent] = {}
+                entry_stat = stats_by_dir[parent].get(out_path.name)
+                if entry_stat is not None:
+                    logger.debug(f"[BATCH] Fichier de sortie vérifié: {out_path} (taille: {entry_stat.st_size} octets)")
+                else:
+                    logger.error(f"[BATCH] ERREUR: Le fichier de sortie n'existe pas: {out_path}")
+
+            logger.info(f"[BATCH] {processed_count} images traitées avec succès sur {len(unique_to_process)}")
             
             # Vérifier s'il reste des images non traitées
-            if processed_count < len(images_to_process):
-                remaining = len(images_to_process) - processed_count
+            if processed_count < len(unique_to_process):
+                remaining = len(unique_to_process) - processed_count
                 logger.warning(f"[BATCH] {remaining} images n'ont pas pu être traitées")
                 # Ajouter des entrées None pour les images non traitées
-                for i in range(processed_count, len(images_to_process)):
-                    if "original_index" in images_to_process[i]:
-                        results[images_to_process[i]["original_index"]] = (None, False)
+                for i in range(processed_count, len(unique_to_process)):
+                    if "original_index" in unique_to_process[i]:
+                        results[unique_to_process[i]["original_index"]] = (None, False)
 
             return results
 
@@ -1506,6 +1652,11 @@ class ImageEnhancer:
                     ):
                         prompt += ", black and white, monochrome"
 
+            # Les images restées en N&B sont transmises en niveaux de gris
+            # 8 bits : ~3x moins d'octets à encoder et à transférer
+            if is_bw:
+                processed_img = processed_img.convert("L")
+
             # Encoder l'image prétraitée
             encoded_image = self.encode_image_to_base64(processed_img, output_format)
 
@@ -1548,7 +1699,7 @@ class ImageEnhancer:
 
             # Vérification de la réponse
             if not isinstance(response, dict):
-                error_msg = f"Réponse API invalide (type: {type(response)}): {response}"
+                error_msg = f"Réponse API invalide (type: {type(response)})"
                 logger.error(error_msg)
                 raise ValueError(error_msg)
 
@@ -1777,10 +1928,14 @@ def main():
             pattern_path = Path(pattern).expanduser()
 
             # Si c'est un répertoire, ajouter tous les fichiers d'images
+            # en un seul parcours récursif filtré par extension
             if pattern_path.is_dir():
-                image_extensions = {"*.jpg", "*.jpeg", "*.png", "*.webp"}
-                for ext in image_extensions:
-                    expanded_paths.extend(Path(pattern_path).glob("**/" + ext))
+                image_extensions = {".jpg", ".jpeg", ".png", ".webp"}
+                expanded_paths.extend(
+                    p
+                    for p in pattern_path.rglob("*")
+                    if p.suffix.lower() in image_extensions and p.is_file()
+                )
                 continue
 
             # Si c'est un fichier, l'ajouter directement
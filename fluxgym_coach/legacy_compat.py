@@ -3,6 +3,8 @@ Module de compatibilité pour la migration vers le nouveau processeur batch.
 Permet d'utiliser la nouvelle implémentation avec l'ancienne interface.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
@@ -72,9 +74,23 @@ class LegacyBatchProcessor:
         """
         # Convertir les chemins en objets Path
         image_paths = [Path(p) for p in image_paths]
-        
-        # Filtrer les chemins qui n'existent pas
-        valid_paths = [p for p in image_paths if p.exists()]
+
+        # Filtrer les chemins qui n'existent pas : un seul scandir par
+        # répertoire parent remplace un stat() par fichier, ce qui compte
+        # quand tout le lot vient du même dossier
+        names_by_parent: Dict[Path, set] = {}
+        valid_paths = []
+        for path in image_paths:
+            parent = path.parent
+            existing = names_by_parent.get(parent)
+            if existing is None:
+                try:
+                    existing = {entry.name for entry in os.scandir(parent)}
+                except OSError:
+                    existing = set()
+                names_by_parent[parent] = existing
+            if path.name in existing:
+                valid_paths.append(path)
         
         # Traiter les images avec le nouveau processeur
         results = self.batch_processor.process_batch(
@@ -85,22 +101,61 @@ class LegacyBatchProcessor:
             output_format=output_format
         )
         
-        # Convertir les résultats au format attendu (chemin, est_nb)
-        # Pour les chemins non valides, ajouter (None, False)
-        result_map = {}
-        for path, (output_path, is_bw) in zip(valid_paths, results):
-            result_map[path] = (output_path, is_bw)
-        
-        # Retourner les résultats dans le même ordre que les entrées
-        final_results = []
-        for path in image_paths:
-            if path in result_map:
-                final_results.append(result_map[path])
-            else:
-                final_results.append((None, False))
-        
+        # Reconstruire les résultats dans l'ordre des entrées en une seule
+        # passe : les résultats suivent l'ordre de valid_paths, il suffit
+        # de les consommer au fil des chemins valides
+        valid_set = set(valid_paths)
+        results_iter = iter(results)
+        final_results = [
+            next(results_iter) if path in valid_set else (None, False)
+            for path in image_paths
+        ]
+
         return final_results
 
+    def upscale_batch_concurrent(
+        self,
+        image_paths: List[Union[str, Path]],
+        chunk_size: int = 4,
+        max_in_flight: int = 4,
+        **kwargs: Any,
+    ) -> List[Tuple[Optional[Path], bool]]:
+        """
+        Variante concurrente d'upscale_batch.
+
+        Découpe le lot en sous-lots traités en parallèle, de sorte que
+        plusieurs requêtes HTTP vers l'API soient en vol simultanément :
+        le débit est alors borné par la concurrence du serveur plutôt que
+        par la latence aller-retour de chaque appel.
+
+        Args:
+            image_paths: Liste des chemins vers les images sources
+            chunk_size: Nombre d'images par sous-lot envoyé à l'API
+            max_in_flight: Nombre maximum de requêtes simultanées
+            **kwargs: Arguments transmis tels quels à upscale_batch
+
+        Returns:
+            Liste de tuples (chemin_sortie, est_nb) dans l'ordre des entrées
+        """
+        image_paths = [Path(p) for p in image_paths]
+        if not image_paths:
+            return []
+
+        chunks = [
+            image_paths[i:i + chunk_size]
+            for i in range(0, len(image_paths), chunk_size)
+        ]
+
+        # executor.map préserve l'ordre des sous-lots, donc l'ordre global
+        results: List[Tuple[Optional[Path], bool]] = []
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for chunk_results in executor.map(
+                lambda chunk: self.upscale_batch(chunk, **kwargs), chunks
+            ):
+                results.extend(chunk_results)
+
+        return results
+
 
 def get_legacy_processor(api_url: str = "http://127.0.0.1:7860") -> LegacyBatchProcessor:
     """
@@ -1,18 +1,36 @@
 """Module d'extraction de métadonnées pour Fluxgym-coach."""
 
+import atexit
 import json
 import logging
 import hashlib
+import mmap
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
+from collections import defaultdict
 from typing import Dict, List, Any, Optional
-import exifread
 from PIL import Image, ExifTags
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
 
+# Taille des blocs lus pour le hachage rapide (début et fin de fichier)
+_QUICK_HASH_BLOCK = 64 * 1024
+
+# En dessous de cette taille, le coût d'installation d'un mmap dépasse
+# le gain : les petits fichiers restent sur le chemin de lecture classique
+_MMAP_HASH_THRESHOLD = 64 * 1024
+
+# Tables de correspondance EXIF résolues une seule fois à l'import
+_EXIF_TAGS = ExifTags.TAGS
+_GPS_TAGS = ExifTags.GPSTAGS
+
+# Raccourci résolu à l'import pour la boucle chaude par image
+_fromts = datetime.fromtimestamp
+
 
 class MetadataExtractor:
     """Classe pour l'extraction des métadonnées des images."""
@@ -27,27 +45,194 @@ class MetadataExtractor:
         self.metadata_dir = output_dir / "metadata"
         self.metadata_dir.mkdir(parents=True, exist_ok=True)
 
+        # Cache (chemin, taille, mtime_ns) -> hachage de contenu : les
+        # fichiers inchangés entre deux exécutions ne sont pas relus
+        self._hash_cache_file = self.metadata_dir / ".hash_cache.json"
+        self._hash_cache: Dict[str, str] = self._load_hash_cache()
+        atexit.register(self._save_hash_cache)
+
+    def _load_hash_cache(self) -> Dict[str, str]:
+        """Charge le cache de hachages depuis le disque.
+
+        Returns:
+            Dictionnaire des hachages mis en cache (vide si absent ou invalide)
+        """
+        try:
+            with open(self._hash_cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+                if isinstance(cache, dict):
+                    return cache
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        except Exception as e:
+            logger.warning(f"Impossible de charger le cache de hachages: {str(e)}")
+        return {}
+
+    def _save_hash_cache(self) -> None:
+        """Sauvegarde le cache de hachages sur le disque (écriture atomique)."""
+        try:
+            temp_file = self._hash_cache_file.with_suffix(
+                self._hash_cache_file.suffix + ".tmp"
+            )
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(self._hash_cache, f)
+            os.replace(temp_file, self._hash_cache_file)
+        except FileNotFoundError:
+            # Le dossier de sortie a pu être supprimé avant la fin du
+            # processus (répertoires temporaires notamment)
+            pass
+        except Exception as e:
+            logger.warning(f"Impossible de sauvegarder le cache de hachages: {str(e)}")
+
+    def _cached_file_hash(self, file_path: Path) -> str:
+        """Retourne le hachage du fichier en réutilisant le cache si possible.
+
+        Args:
+            file_path: Chemin du fichier à hacher
+
+        Returns:
+            Hachage du contenu du fichier
+        """
+        try:
+            st = file_path.stat()
+            cache_key = f"{file_path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+        except OSError:
+            return self.generate_file_hash(file_path)
+
+        cached = self._hash_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        file_hash = self.generate_file_hash(file_path)
+        self._hash_cache[cache_key] = file_hash
+        return file_hash
+
     def generate_file_hash(
-        self, file_path: Path, hash_algorithm: str = "sha256"
+        self, file_path: Path, hash_algorithm: str = "blake2b"
     ) -> str:
         """Génère un hachage pour un fichier.
 
+        Le hachage sert uniquement de clé de déduplication locale ; BLAKE2b
+        est nettement plus rapide que SHA-256 à sécurité équivalente.
+
         Args:
             file_path: Chemin du fichier à hacher
-            hash_algorithm: Algorithme de hachage à utiliser (par défaut: sha256)
+            hash_algorithm: Algorithme de hachage à utiliser (par défaut: blake2b)
 
         Returns:
             Chaîne de caractères représentant le hachage du fichier
         """
-        hasher = hashlib.new(hash_algorithm)
-
         with open(file_path, "rb") as f:
-            # Lire le fichier par blocs pour gérer les gros fichiers
-            for chunk in iter(lambda: f.read(4096), b""):
-                hasher.update(chunk)
+            fd = f.fileno()
+            size = os.fstat(fd).st_size
+
+            # Annoncer la lecture séquentielle au noyau : fenêtre de
+            # readahead doublée et préchargement asynchrone des pages
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+
+            try:
+                if size > _MMAP_HASH_THRESHOLD:
+                    # mmap laisse le hacheur lire directement le cache de pages,
+                    # sans copie par blocs en espace utilisateur
+                    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                        hasher = hashlib.new(hash_algorithm)
+                        hasher.update(mm)
+                        return hasher.hexdigest()
+
+                if sys.version_info >= (3, 11):
+                    # file_digest lit dans un tampon interne réutilisé et
+                    # relâche le GIL pendant le hachage
+                    return hashlib.file_digest(f, hash_algorithm).hexdigest()
+
+                hasher = hashlib.new(hash_algorithm)
+                # Lire par readinto dans un tampon de 1 Mio réutilisé :
+                # une seule allocation par fichier au lieu d'un objet
+                # bytes par itération
+                buf = bytearray(1 << 20)
+                view = memoryview(buf)
+                while n := f.readinto(buf):
+                    hasher.update(view[:n])
+                return hasher.hexdigest()
+            finally:
+                # Les octets ne seront pas relus : rendre les pages au
+                # cache plutôt que d'en évincer d'autres
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+    def _quick_hash(self, file_path: Path, size: int) -> str:
+        """Hachage rapide du premier et du dernier bloc de 64 Kio.
 
+        Args:
+            file_path: Chemin du fichier à hacher
+            size: Taille du fichier en octets (déjà connue via stat)
+
+        Returns:
+            Hachage des blocs de début et de fin du fichier
+        """
+        hasher = hashlib.new("blake2b")
+        fd = os.open(str(file_path), os.O_RDONLY)
+        try:
+            hasher.update(os.pread(fd, _QUICK_HASH_BLOCK, 0))
+            if size > _QUICK_HASH_BLOCK:
+                hasher.update(
+                    os.pread(fd, _QUICK_HASH_BLOCK, size - _QUICK_HASH_BLOCK)
+                )
+        finally:
+            os.close(fd)
         return hasher.hexdigest()
 
+    def dedup_scan(self, paths: List[Path]) -> Dict[str, List[Path]]:
+        """Regroupe des fichiers par contenu identique en plusieurs phases.
+
+        La plupart des fichiers distincts diffèrent déjà par leur taille :
+        seuls les groupes de même taille sont hachés, d'abord rapidement
+        (premier et dernier bloc de 64 Kio), puis intégralement en cas de
+        collision du hachage rapide. Les fichiers uniques dès la taille ou
+        le hachage rapide ne sont jamais lus en entier.
+
+        Args:
+            paths: Chemins des fichiers à comparer
+
+        Returns:
+            Dictionnaire clé de contenu -> liste des chemins partageant ce
+            contenu. Les fichiers hachés intégralement sont indexés par leur
+            hachage de contenu ; les fichiers uniques par une clé
+            ``unique:<chemin>``.
+        """
+        by_size: Dict[int, List[Path]] = defaultdict(list)
+        for path in paths:
+            try:
+                by_size[path.stat().st_size].append(path)
+            except OSError as e:
+                logger.warning(f"Impossible de lire {path}: {str(e)}")
+
+        result: Dict[str, List[Path]] = {}
+        for size, group in by_size.items():
+            if len(group) == 1:
+                result[f"unique:{group[0]}"] = group
+                continue
+
+            by_quick: Dict[str, List[Path]] = defaultdict(list)
+            for path in group:
+                try:
+                    by_quick[self._quick_hash(path, size)].append(path)
+                except OSError as e:
+                    logger.warning(f"Impossible de hacher {path}: {str(e)}")
+
+            for candidates in by_quick.values():
+                if len(candidates) == 1:
+                    result[f"unique:{candidates[0]}"] = candidates
+                    continue
+                # Collision du hachage rapide : hachage complet requis
+                for path in candidates:
+                    result.setdefault(self._cached_file_hash(path), []).append(
+                        path
+                    )
+
+        return result
+
     def extract_exif_data(self, image_path: Path) -> Dict[str, Any]:
         """Extrait les données EXIF d'une image.
 
@@ -57,26 +242,11 @@ class MetadataExtractor:
         Returns:
             Dictionnaire des métadonnées EXIF
         """
-        metadata = {}
+        metadata: Dict[str, Any] = {}
 
         try:
-            # Utiliser exifread pour extraire les métadonnées brutes
-            with open(image_path, "rb") as f:
-                tags = exifread.process_file(f, details=False)
-
-                for tag, value in tags.items():
-                    if tag not in (
-                        "JPEGThumbnail",
-                        "TIFFThumbnail",
-                        "Filename",
-                        "EXIF MakerNote",
-                    ):
-                        # Nettoyer la valeur pour la sérialisation JSON
-                        try:
-                            metadata[str(tag)] = str(value)
-                        except (UnicodeEncodeError, UnicodeDecodeError):
-                            logger.warning(f"Erreur d'encodage pour le tag {tag}")
-
+            with Image.open(image_path) as img:
+                metadata = self._exif_from_image(img)
         except Exception as e:
             logger.error(
                 f"Erreur lors de l'extraction des métadonnées EXIF de "
@@ -85,6 +255,54 @@ class MetadataExtractor:
 
         return metadata
 
+    @staticmethod
+    def _exif_from_image(img: Image.Image) -> Dict[str, Any]:
+        """Extrait les tags EXIF d'une image PIL déjà ouverte.
+
+        Utilise ``Image.getexif`` (code C de Pillow), nettement plus rapide
+        que l'analyse pur-Python d'exifread, et parcourt aussi les
+        sous-répertoires IFD (Exif, GPS) pour les tags détaillés.
+
+        Args:
+            img: Image PIL ouverte
+
+        Returns:
+            Dictionnaire des tags EXIF nommés
+        """
+        exif_data: Dict[str, Any] = {}
+        exif = img.getexif()
+        if not exif:
+            return exif_data
+
+        for tag, value in exif.items():
+            tag_name = _EXIF_TAGS.get(tag)
+            if tag_name is None or tag_name == "MakerNote":
+                continue
+            try:
+                exif_data[tag_name] = str(value)
+            except (TypeError, ValueError):
+                pass
+
+        # Sous-répertoires IFD (Exif, GPS) qu'exifread exposait séparément
+        for ifd_id, tag_map in (
+            (ExifTags.IFD.Exif, _EXIF_TAGS),
+            (ExifTags.IFD.GPSInfo, _GPS_TAGS),
+        ):
+            try:
+                ifd = exif.get_ifd(ifd_id)
+            except KeyError:
+                continue
+            for tag, value in ifd.items():
+                tag_name = tag_map.get(tag)
+                if tag_name is None or tag_name == "MakerNote":
+                    continue
+                try:
+                    exif_data[tag_name] = str(value)
+                except (TypeError, ValueError):
+                    pass
+
+        return exif_data
+
     def extract_basic_metadata(self, image_path: Path) -> Dict[str, Any]:
         """Extrait les métadonnées de base d'une image.
 
@@ -94,14 +312,18 @@ class MetadataExtractor:
         Returns:
             Dictionnaire des métadonnées de base
         """
+        # Un seul appel stat() pour la taille et les deux horodatages ;
+        # absolute() (et son getcwd() interne) n'est appelé que pour les
+        # chemins relatifs
+        st = image_path.stat()
         metadata = {
             "filename": image_path.name,
-            "filepath": str(image_path.absolute()),
-            "size_bytes": image_path.stat().st_size,
-            "last_modified": datetime.fromtimestamp(
-                image_path.stat().st_mtime
-            ).isoformat(),
-            "created": datetime.fromtimestamp(image_path.stat().st_ctime).isoformat(),
+            "filepath": str(
+                image_path if image_path.is_absolute() else image_path.absolute()
+            ),
+            "size_bytes": st.st_size,
+            "last_modified": _fromts(st.st_mtime).isoformat(),
+            "created": _fromts(st.st_ctime).isoformat(),
         }
 
         try:
@@ -119,13 +341,14 @@ class MetadataExtractor:
                 if hasattr(img, "_getexif") and img._getexif() is not None:
                     exif_data = {}
                     for tag, value in img._getexif().items():
-                        if tag in ExifTags.TAGS:
-                            tag_name = ExifTags.TAGS[tag]
-                            try:
-                                # Essayer de convertir en JSON-sérialisable
-                                exif_data[tag_name] = str(value)
-                            except (TypeError, ValueError):
-                                pass
+                        tag_name = _EXIF_TAGS.get(tag)
+                        if tag_name is None:
+                            continue
+                        try:
+                            # Essayer de convertir en JSON-sérialisable
+                            exif_data[tag_name] = str(value)
+                        except (TypeError, ValueError):
+                            pass
 
                     if exif_data:
                         metadata["exif"] = exif_data
@@ -138,6 +361,85 @@ class MetadataExtractor:
 
         return metadata
 
+    def extract_all(
+        self, image_path: Path, with_exif: bool = True
+    ) -> Dict[str, Any]:
+        """Extrait toutes les métadonnées d'une image en une seule ouverture.
+
+        Le même descripteur de fichier sert au hachage puis, après un
+        seek(0), à PIL : la seconde passe touche le cache de pages du noyau
+        au lieu de retraverser le répertoire, et aucun tampon de la taille
+        du fichier n'est conservé en mémoire.
+
+        Args:
+            image_path: Chemin de l'image
+            with_exif: Si False, l'analyse EXIF (souvent l'étape la plus
+                longue après le hachage) est entièrement sautée pour les
+                appelants qui n'ont besoin que des dimensions et du hachage
+
+        Returns:
+            Dictionnaire complet des métadonnées (avec 'content_hash')
+        """
+        # Les appelants de process_metadata passent des chemins déjà
+        # résolus : absolute()/resolve() ne sont appelés qu'en secours
+        abs_path = image_path if image_path.is_absolute() else image_path.resolve()
+        st = image_path.stat()
+        metadata: Dict[str, Any] = {
+            "filename": image_path.name,
+            "filepath": str(abs_path),
+            "size_bytes": st.st_size,
+            "last_modified": _fromts(st.st_mtime).isoformat(),
+            "created": _fromts(st.st_ctime).isoformat(),
+        }
+
+        with open(image_path, "rb") as f:
+            # Hachage du contenu (réutilise le cache si le fichier
+            # est inchangé depuis la dernière exécution)
+            cache_key = f"{abs_path}|{st.st_size}|{st.st_mtime_ns}"
+            file_hash = self._hash_cache.get(cache_key)
+            if file_hash is None:
+                if st.st_size > _MMAP_HASH_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        hasher = hashlib.new("blake2b")
+                        hasher.update(mm)
+                        file_hash = hasher.hexdigest()
+                elif sys.version_info >= (3, 11):
+                    file_hash = hashlib.file_digest(f, "blake2b").hexdigest()
+                else:
+                    hasher = hashlib.new("blake2b")
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        hasher.update(chunk)
+                    file_hash = hasher.hexdigest()
+                self._hash_cache[cache_key] = file_hash
+            metadata["content_hash"] = file_hash
+
+            # Métadonnées image et EXIF via PIL, depuis le même descripteur —
+            # l'analyse EXIF est sautée si l'appelant n'en veut pas
+            try:
+                f.seek(0)
+                with Image.open(f) as img:
+                    metadata.update(
+                        {
+                            "format": img.format,
+                            "mode": img.mode,
+                            "width": img.width,
+                            "height": img.height,
+                        }
+                    )
+
+                    if with_exif:
+                        exif_data = self._exif_from_image(img)
+                        if exif_data:
+                            metadata["exif"] = exif_data
+                            metadata["exif_detailed"] = exif_data
+            except Exception as e:
+                logger.error(
+                    f"Erreur lors de l'extraction des métadonnées de base "
+                    f"de {image_path}: {str(e)}"
+                )
+
+        return metadata
+
     def save_metadata(self, image_path: Path, metadata: Dict[str, Any]) -> Path:
         """Sauvegarde les métadonnées dans un fichier JSON.
 
@@ -153,9 +455,6 @@ class MetadataExtractor:
             KeyError: Si 'content_hash' n'est pas présent dans les métadonnées
         """
         try:
-            logger.debug(f"Début de save_metadata pour {image_path}")
-            logger.debug(f"Contenu des métadonnées: {metadata.keys()}")
-
             if "content_hash" not in metadata:
                 raise KeyError("Le hachage de contenu est requis dans les métadonnées")
 
@@ -163,56 +462,17 @@ class MetadataExtractor:
             # Cela garantit que le fichier de métadonnées correspondra au format attendu par le test
             metadata_file = self.metadata_dir / f"{image_path.stem}_metadata.json"
 
-            # S'assurer que le dossier de métadonnées existe
-            logger.debug(f"Création du dossier de métadonnées: {self.metadata_dir}")
-            self.metadata_dir.mkdir(parents=True, exist_ok=True)
-
-            logger.debug(
-                f"Tentative de sauvegarde des métadonnées dans: {metadata_file}"
-            )
-            logger.debug(f"Dossier de métadonnées existe: {self.metadata_dir.exists()}")
-            logger.debug(
-                f"Droits d'écriture: {os.access(str(self.metadata_dir), os.W_OK)}"
-            )
-            logger.debug(
-                f"Le fichier de métadonnées existe déjà: {metadata_file.exists()}"
-            )
-
-            # Vérifier si le fichier existe déjà
-            if metadata_file.exists():
-                logger.debug(
-                    f"Le fichier de métadonnées existe déjà, il sera écrasé: {metadata_file}"
-                )
-
-            # Essayer d'écrire dans un fichier temporaire d'abord
-            temp_file = metadata_file.with_suffix(".tmp")
-            logger.debug(f"Écriture dans un fichier temporaire: {temp_file}")
+            # Sérialiser une seule fois en mémoire, écrire les octets d'un
+            # bloc, puis remplacer atomiquement le fichier cible
+            data = json.dumps(metadata, indent=2, ensure_ascii=False).encode("utf-8")
+            # Ajouter .tmp au suffixe existant plutôt que le remplacer, pour
+            # éviter toute collision entre fichiers temporaires de stems voisins
+            temp_file = metadata_file.with_suffix(metadata_file.suffix + ".tmp")
 
             try:
-                with open(temp_file, "w", encoding="utf-8") as f:
-                    json.dump(metadata, f, indent=2, ensure_ascii=False)
-
-                # Vérifier que le fichier temporaire a été créé
-                if not temp_file.exists() or temp_file.stat().st_size == 0:
-                    raise IOError("Le fichier temporaire n'a pas été créé correctement")
-
-                # Remplacer le fichier existant par le fichier temporaire
-                if metadata_file.exists():
-                    metadata_file.unlink()
-                temp_file.rename(metadata_file)
-
+                temp_file.write_bytes(data)
+                os.replace(temp_file, metadata_file)
                 logger.debug(f"Métadonnées sauvegardées avec succès: {metadata_file}")
-                logger.debug(f"Fichier de métadonnées existe: {metadata_file.exists()}")
-
-                if metadata_file.exists():
-                    logger.debug(
-                        f"Taille du fichier: {metadata_file.stat().st_size} octets"
-                    )
-                else:
-                    logger.error(
-                        "Le fichier de métadonnées n'existe pas après la sauvegarde"
-                    )
-
                 return metadata_file
 
             except Exception as e:
@@ -237,19 +497,54 @@ class MetadataExtractor:
             )
             raise
 
-    def extract_and_save_metadata(self, image_path: Path) -> Optional[Dict[str, Any]]:
+    def extract_and_save_metadata(
+        self, image_path: Path, with_exif: bool = True
+    ) -> Optional[Dict[str, Any]]:
         """Extrait et sauvegarde toutes les métadonnées d'une image.
 
         Args:
             image_path: Chemin de l'image
+            with_exif: Si False, l'extraction EXIF est différée — les
+                appelants qui n'ont besoin que des dimensions et du hachage
+                évitent l'analyse EXIF, souvent l'étape la plus coûteuse
+                après le hachage
 
         Returns:
             Dictionnaire des métadonnées ou None en cas d'erreur
         """
         try:
             logger.debug(f"Traitement du fichier: {image_path}")
-            logger.debug(f"Le fichier existe: {image_path.exists()}")
 
+            metadata = self.extract_metadata(image_path, with_exif=with_exif)
+            if metadata is None:
+                return None
+
+            # Toujours régénérer les métadonnées pour s'assurer qu'elles sont à jour
+            saved_path = self.save_metadata(image_path, metadata)
+            logger.debug(f"Métadonnées sauvegardées dans: {saved_path}")
+
+            return metadata
+
+        except Exception as e:
+            logger.error(
+                f"Erreur lors de l'extraction des métadonnées "
+                f"pour {image_path}: {str(e)}"
+            )
+            return None
+
+    def extract_metadata(
+        self, image_path: Path, with_exif: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Extrait toutes les métadonnées d'une image sans les sauvegarder.
+
+        Args:
+            image_path: Chemin de l'image
+            with_exif: Si False, l'extraction EXIF est sautée
+
+        Returns:
+            Dictionnaire des métadonnées ou None en cas d'erreur
+        """
+        try:
             # Vérifier si le fichier est une image valide
             if not image_path.is_file():
                 logger.warning(
@@ -258,43 +553,9 @@ class MetadataExtractor:
                 )
                 return None
 
-            logger.debug("Extraction des métadonnées de base...")
-            # Extraire les métadonnées de base
-            metadata = self.extract_basic_metadata(image_path)
-            logger.debug(f"Métadonnées de base extraites: {bool(metadata)}")
-
-            logger.debug("Extraction des données EXIF...")
-            # Extraire les données EXIF détaillées
-            exif_data = self.extract_exif_data(image_path)
-            if exif_data:
-                metadata["exif_detailed"] = exif_data
-                logger.debug(f"Données EXIF extraites: {len(exif_data)} éléments")
-            else:
-                logger.debug("Aucune donnée EXIF trouvée")
-
-            logger.debug("Génération du hachage du fichier...")
-            # Générer un hachage du contenu de l'image
-            file_hash = self.generate_file_hash(image_path)
-            metadata["content_hash"] = file_hash
-            logger.debug(f"Hachage généré: {file_hash}")
-
-            # Utiliser le nom du fichier (sans extension) comme base pour le nom du fichier de métadonnées
-            # Cela garantit que le fichier de métadonnées correspondra au format attendu par le test
-            metadata_file = self.metadata_dir / f"{image_path.stem}_metadata.json"
-            logger.debug(f"Chemin du fichier de métadonnées: {metadata_file}")
-            logger.debug(
-                f"Le fichier de métadonnées existe déjà: {metadata_file.exists()}"
-            )
-
-            # Toujours régénérer les métadonnées pour s'assurer qu'elles sont à jour
-            logger.debug("Sauvegarde des métadonnées...")
-            saved_path = self.save_metadata(image_path, metadata)
-            logger.debug(f"Métadonnées sauvegardées dans: {saved_path}")
-            logger.debug(
-                f"Le fichier de métadonnées existe maintenant: {saved_path.exists() if saved_path else 'N/A'}"
-            )
-
-            return metadata
+            # Extraire métadonnées de base, EXIF et hachage en une seule
+            # lecture du fichier
+            return self.extract_all(image_path, with_exif=with_exif)
 
         except Exception as e:
             logger.error(
@@ -304,12 +565,18 @@ class MetadataExtractor:
             return None
 
 
-def process_metadata(image_paths: List[Path], output_dir: Path) -> int:
+def process_metadata(
+    image_paths: List[Path], output_dir: Path, manifest_mode: bool = False
+) -> int:
     """Traite les métadonnées pour une liste d'images.
 
     Args:
         image_paths: Liste des chemins d'images à traiter
         output_dir: Dossier de sortie pour les métadonnées
+        manifest_mode: Si True, écrit toutes les métadonnées dans un seul
+            fichier ``metadata/manifest.jsonl`` (une ligne JSON par image)
+            au lieu d'un fichier JSON par image — N ouvertures/écritures
+            deviennent une seule
 
     Returns:
         Nombre d'images traitées avec succès
@@ -321,40 +588,70 @@ def process_metadata(image_paths: List[Path], output_dir: Path) -> int:
     extractor = MetadataExtractor(output_dir)
     success_count = 0
 
+    # Résoudre les chemins en série (peu coûteux) avant le traitement parallèle
+    resolved_paths = []
     for image_path in image_paths:
-        try:
-            # Vérifier si le fichier existe
-            if not image_path.exists():
-                # Si le fichier n'existe pas, vérifier s'il s'agit d'un fichier déjà renommé dans le dossier de sortie
-                if output_dir in image_path.parents:
-                    # Le fichier est déjà dans le dossier de sortie, on peut le traiter directement
-                    pass
-                else:
-                    # Essayer de trouver le fichier dans le dossier de sortie
-                    output_file = output_dir / image_path.name
-                    if output_file.exists():
-                        image_path = output_file
-                    else:
-                        logger.warning(f"Fichier introuvable: {image_path}")
-                        continue
-
-            logger.debug(f"Traitement des métadonnées pour: {image_path}")
-
-            # Extraire et sauvegarder les métadonnées
-            metadata = extractor.extract_and_save_metadata(image_path)
-            if metadata is not None:
-                success_count += 1
-                logger.debug(f"Métadonnées générées avec succès pour: {image_path}")
+        # Vérifier si le fichier existe
+        if not image_path.exists():
+            # Si le fichier n'existe pas, vérifier s'il s'agit d'un fichier déjà renommé dans le dossier de sortie
+            if output_dir in image_path.parents:
+                # Le fichier est déjà dans le dossier de sortie, on peut le traiter directement
+                pass
             else:
-                logger.warning(
-                    f"Échec de la génération des métadonnées pour: {image_path}"
-                )
+                # Essayer de trouver le fichier dans le dossier de sortie
+                output_file = output_dir / image_path.name
+                if output_file.exists():
+                    image_path = output_file
+                else:
+                    logger.warning(f"Fichier introuvable: {image_path}")
+                    continue
+        # Résolution en chemin absolu une seule fois ici, pour que les
+        # méthodes d'extraction n'aient plus à appeler getcwd() par fichier
+        resolved_paths.append(image_path.resolve())
+
+    # Chaque extraction est dominée par les E/S (open, stat, EXIF, hachage,
+    # écriture JSON) : un pool de threads permet de les recouvrir. Chaque
+    # appel écrit un fichier nommé d'après sa propre image, donc les tâches
+    # sont indépendantes.
+    # En mode manifeste, les métadonnées sont accumulées en mémoire puis
+    # écrites en une seule fois au lieu d'un fichier JSON par image
+    task = (
+        extractor.extract_metadata if manifest_mode
+        else extractor.extract_and_save_metadata
+    )
+    manifest_entries: List[Dict[str, Any]] = []
 
-        except Exception as e:
-            logger.error(
-                f"Erreur lors du traitement de {image_path}: {str(e)}", exc_info=True
-            )
-            continue
+    max_workers = min(32, (os.cpu_count() or 4) * 2)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(task, p): p for p in resolved_paths}
+        for future in as_completed(futures):
+            image_path = futures[future]
+            try:
+                metadata = future.result()
+                if metadata is not None:
+                    success_count += 1
+                    if manifest_mode:
+                        manifest_entries.append(metadata)
+                    logger.debug(f"Métadonnées générées avec succès pour: {image_path}")
+                else:
+                    logger.warning(
+                        f"Échec de la génération des métadonnées pour: {image_path}"
+                    )
+            except Exception as e:
+                logger.error(
+                    f"Erreur lors du traitement de {image_path}: {str(e)}",
+                    exc_info=True,
+                )
+                continue
+
+    if manifest_mode:
+        manifest_file = extractor.metadata_dir / "manifest.jsonl"
+        with open(
+            manifest_file, "w", encoding="utf-8", buffering=1 << 20
+        ) as f:
+            for entry in manifest_entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        logger.info(f"Manifeste écrit: {manifest_file}")
 
     logger.info(
         f"Traitement des métadonnées terminé. {success_count}/"
@@ -1,21 +1,152 @@
 """Module de traitement des images pour Fluxgym-coach."""
 
 import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import repeat
 from pathlib import Path
-from typing import Iterator, Optional, Tuple, Dict, Any
-from PIL import Image, UnidentifiedImageError
+from typing import Callable, Iterator, Optional, Tuple, Dict, Any
 
 from .image_cache import ImageCache, get_default_cache
+from .utils.config import get_config
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - plateformes non POSIX
+    fcntl = None  # type: ignore[assignment]
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
 
+# Validateurs d'en-tête par suffixe : chaque fonction vérifie la
+# signature propre à son format sur les 16 premiers octets, sans
+# parcourir une table de signatures ni construire d'objet PIL
+
+
+def _is_jpeg(head: bytes) -> bool:
+    return head.startswith(b"\xff\xd8\xff")
+
+
+def _is_png(head: bytes) -> bool:
+    return head.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+def _is_gif(head: bytes) -> bool:
+    return head.startswith(b"GIF8")
+
+
+def _is_bmp(head: bytes) -> bool:
+    return head.startswith(b"BM")
+
+
+def _is_tiff(head: bytes) -> bool:
+    return head.startswith(b"II*\x00") or head.startswith(b"MM\x00*")
+
+
+def _is_webp(head: bytes) -> bool:
+    # RIFF est un conteneur générique : confirmer la sous-signature WEBP
+    return head.startswith(b"RIFF") and head[8:12] == b"WEBP"
+
+
+_VALIDATORS: Dict[str, Callable[[bytes], bool]] = {
+    ".jpg": _is_jpeg,
+    ".jpeg": _is_jpeg,
+    ".png": _is_png,
+    ".gif": _is_gif,
+    ".bmp": _is_bmp,
+    ".tiff": _is_tiff,
+    ".webp": _is_webp,
+}
+
+# ioctl FICLONE : clone copy-on-write sur btrfs/XFS/ZFS (Linux)
+_FICLONE = 0x40049409
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """Copie un fichier en privilégiant les mécanismes noyau.
+
+    Essaie dans l'ordre : clone copy-on-write (FICLONE, O(1) quel que
+    soit la taille), puis os.copy_file_range (copie intra-noyau sans
+    transit par l'espace utilisateur), puis shutil.copy2 en dernier
+    recours. Les métadonnées (mtime, mode) sont préservées dans tous
+    les cas, comme avec shutil.copy2.
+
+    Args:
+        src: Chemin du fichier source
+        dst: Chemin du fichier de destination
+    """
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            src_fd = fsrc.fileno()
+            dst_fd = fdst.fileno()
+
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+                    shutil.copystat(src, dst)
+                    return
+                except OSError:
+                    # Système de fichiers sans reflink ou copie
+                    # inter-volumes : passer à la méthode suivante
+                    pass
+
+            if hasattr(os, "copy_file_range"):
+                remaining = os.fstat(src_fd).st_size
+                offset = 0
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst_fd, remaining, offset, offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+                    remaining -= copied
+                if remaining == 0:
+                    shutil.copystat(src, dst)
+                    return
+    except OSError:
+        pass
+
+    shutil.copy2(src, dst)
+
+
+# Processeur réutilisé au sein de chaque processus du pool : l'état
+# (cache, index de sortie) est reconstruit une fois par worker plutôt
+# qu'une fois par image
+_worker_processor: Optional["ImageProcessor"] = None
+
+
+def _process_path_in_worker(
+    input_dir: str, output_dir: str, file_path: str
+) -> Optional[Tuple[Path, Path]]:
+    """Traite une image dans un processus du pool.
+
+    Fonction de module (donc picklable) qui reconstruit l'état du
+    processeur à partir des chemins d'entrée/sortie, en le mémorisant
+    pour les appels suivants du même worker.
+
+    Args:
+        input_dir: Dossier source contenant les images
+        output_dir: Dossier de destination pour les images traitées
+        file_path: Chemin du fichier image à traiter
+
+    Returns:
+        Résultat de process_image pour ce fichier
+    """
+    global _worker_processor
+    if _worker_processor is None or (
+        str(_worker_processor.input_dir),
+        str(_worker_processor.output_dir),
+    ) != (input_dir, output_dir):
+        _worker_processor = ImageProcessor(Path(input_dir), Path(output_dir))
+    return _worker_processor.process_image(Path(file_path))
+
 
 class ImageProcessor:
     """Classe pour le traitement des images."""
 
-    # Extensions d'images supportées
-    SUPPORTED_EXTENSIONS = {"jpeg", "jpg", "png", "gif", "bmp", "tiff", "webp"}
+    # Suffixes d'images supportés (forme pointée de Path.suffix),
+    # dérivés de la table de validateurs pour rester synchronisés
+    SUPPORTED_SUFFIXES = frozenset(_VALIDATORS)
 
     def __init__(
         self,
@@ -23,6 +154,7 @@ class ImageProcessor:
         output_dir: Path,
         cache: Optional[ImageCache] = None,
         cache_params: Optional[Dict[str, Any]] = None,
+        link_mode: Optional[str] = None,
     ):
         """Initialise le processeur d'images.
 
@@ -31,9 +163,15 @@ class ImageProcessor:
             output_dir: Dossier de destination pour les images traitées
             cache: Instance de ImageCache à utiliser (optionnel)
             cache_params: Paramètres pour initialiser un nouveau cache si aucun n'est fourni (optionnel)
+            link_mode: Mode de matérialisation des fichiers de sortie :
+                "hardlink", "symlink", "reflink" ou "copy" (par défaut:
+                processing.link_mode de la configuration)
         """
         self.input_dir = input_dir
         self.output_dir = output_dir
+        if link_mode is None:
+            link_mode = get_config().get("processing.link_mode", "hardlink")
+        self.link_mode = link_mode
 
         # Initialiser le cache
         self.cache = cache or get_default_cache()
@@ -43,6 +181,10 @@ class ImageProcessor:
         # Créer le dossier de sortie s'il n'existe pas
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Index en mémoire des fichiers déjà présents en sortie : un seul
+        # scandir à la construction remplace un stat() par image traitée
+        self._output_names = {entry.name for entry in os.scandir(self.output_dir)}
+
         logger.debug(f"ImageProcessor initialisé avec le cache: {self.cache}")
 
     def is_image_file(self, file_path: Path) -> bool:
@@ -57,18 +199,52 @@ class ImageProcessor:
         if not file_path.is_file():
             return False
 
-        # Vérification de l'extension
-        if file_path.suffix[1:].lower() not in self.SUPPORTED_EXTENSIONS:
+        # Sélection du validateur propre au suffixe : un seul accès au
+        # dictionnaire couvre le filtre d'extension et le choix du test
+        validator = _VALIDATORS.get(file_path.suffix.lower())
+        if validator is None:
             return False
 
-        # Vérification du type d'image avec PIL
+        # Vérification du nombre magique : 16 octets lus au lieu d'un
+        # parcours complet des en-têtes par PIL
         try:
-            with Image.open(file_path) as img:
-                img.verify()
-            return True
-        except (IOError, OSError, UnidentifiedImageError):
+            with open(file_path, "rb") as f:
+                head = f.read(16)
+        except (IOError, OSError):
             return False
 
+        return validator(head)
+
+    def _place_file(self, src: Path, dst: Path) -> None:
+        """Matérialise le fichier de sortie selon self.link_mode.
+
+        Le nom de sortie étant dérivé du hachage du contenu, un lien dur
+        offre la même sémantique qu'une copie pour un coût nul en octets
+        écrits. En cas d'échec (EXDEV entre volumes, fichier déjà
+        présent, système de fichiers sans liens), on retombe sur la
+        copie rapide.
+
+        Args:
+            src: Chemin du fichier source
+            dst: Chemin du fichier de destination
+        """
+        if self.link_mode == "hardlink":
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass
+        elif self.link_mode == "symlink":
+            try:
+                os.symlink(src.resolve(), dst)
+                return
+            except OSError:
+                pass
+
+        # "copy", "reflink" et les replis : _fast_copy tente déjà le
+        # clone copy-on-write avant la copie classique
+        _fast_copy(src, dst)
+
     def get_new_filename(self, file_path: Path, hash_value: str) -> Path:
         """Génère un nouveau nom de fichier basé sur le hachage.
 
@@ -97,37 +273,62 @@ class ImageProcessor:
             Tuple[Path, Path] | None: Un tuple (chemin_original, nouveau_chemin) si le
             traitement a réussi, None sinon
         """
-        if not self.is_image_file(file_path):
+        # Filtre d'extension et choix du validateur : aucun appel système
+        validator = _VALIDATORS.get(file_path.suffix.lower())
+        if validator is None:
             logger.warning(f"Le fichier n'est pas une image supportée: {file_path}")
             return None
 
         try:
-            # Vérifier si l'image est déjà dans le cache
-            new_path = self.output_dir / f"{file_path.stem}{file_path.suffix}"
-
-            is_cached, cached_path = self.cache.is_cached(
-                file_path, output_path=new_path, params=params, return_cached_path=True
-            )
-            if is_cached and cached_path:
-                logger.debug(f"Image déjà dans le cache: {file_path} -> {cached_path}")
-                return (file_path, cached_path)
-            elif (
-                is_cached
-            ):  # Cas où l'image est en cache mais pas de chemin retourné (ne devrait pas arriver)
-                logger.warning(
-                    f"Image marquée comme en cache mais pas de chemin retourné: {file_path}"
+            # Une seule ouverture pour la validation ET le hachage : le
+            # descripteur sert d'abord à lire la signature, puis est
+            # repositionné pour le calcul d'empreinte, sans open()
+            # intermédiaire ni double parcours des en-têtes
+            with open(file_path, "rb") as f:
+                head = f.read(16)
+                if not validator(head):
+                    logger.warning(
+                        f"Le fichier n'est pas une image supportée: {file_path}"
+                    )
+                    return None
+
+                # Vérifier si l'image est déjà dans le cache
+                new_path = self.output_dir / f"{file_path.stem}{file_path.suffix}"
+
+                is_cached, cached_path = self.cache.is_cached(
+                    file_path,
+                    output_path=new_path,
+                    params=params,
+                    return_cached_path=True,
                 )
-                return (file_path, new_path)
+                if is_cached and cached_path:
+                    logger.debug(
+                        f"Image déjà dans le cache: {file_path} -> {cached_path}"
+                    )
+                    return (file_path, cached_path)
+                elif (
+                    is_cached
+                ):  # Cas où l'image est en cache mais pas de chemin retourné (ne devrait pas arriver)
+                    logger.warning(
+                        f"Image marquée comme en cache mais pas de chemin retourné: {file_path}"
+                    )
+                    return (file_path, new_path)
+
+                # Créer un nouveau nom de fichier basé sur le hachage du
+                # fichier via le méta-cache, en réutilisant le descripteur
+                # déjà ouvert en cas de défaut de cache
+                file_hash = self.cache.cached_file_hash(file_path, fileobj=f)
 
-            # Créer un nouveau nom de fichier basé sur le hachage du fichier
-            # via le cache pour éviter les doublons
-            file_hash = self.cache.calculate_file_hash(file_path)
             new_path = self.get_new_filename(file_path, file_hash)
 
-            # Copier le fichier vers le nouveau chemin
-            import shutil
-
-            shutil.copy2(file_path, new_path)
+            # Le nom de sortie étant dérivé du hachage, sa présence dans
+            # l'index suffit : inutile de re-matérialiser le fichier
+            if new_path.name in self._output_names:
+                logger.debug(f"Fichier de sortie déjà présent: {new_path}")
+            else:
+                # Matérialiser le fichier de sortie selon le mode configuré
+                self._place_file(file_path, new_path)
+                self._output_names.add(new_path.name)
 
             # Ajouter au cache
             self.cache.add_to_cache(
@@ -143,6 +344,29 @@ class ImageProcessor:
             )
             return None
 
+    def _iter_files(self) -> Iterator[Path]:
+        """Parcourt récursivement le dossier source via os.scandir.
+
+        Les DirEntry retournés par scandir portent déjà le type de
+        fichier (d_type du getdents Linux) : is_file()/is_dir() ne
+        coûtent aucun stat() supplémentaire, contrairement à
+        rglob("*") suivi de Path.is_file().
+
+        Yields:
+            Chemins des fichiers trouvés
+        """
+        stack = [str(self.input_dir)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield Path(entry.path)
+            except OSError as e:
+                logger.warning(f"Impossible de parcourir le répertoire: {e}")
+
     def process_directory(self) -> Iterator[Tuple[Path, Optional[Path]]]:
         """Traite tous les fichiers images d'un répertoire.
 
@@ -152,9 +376,80 @@ class ImageProcessor:
         logger.info(f"Traitement du répertoire: {self.input_dir}")
 
         # Parcourir récursivement le dossier source
-        for file_path in self.input_dir.rglob("*"):
-            if file_path.is_file():
-                result = self.process_image(file_path)
+        for file_path in self._iter_files():
+            result = self.process_image(file_path)
+            if result:
+                yield result
+
+    def process_directory_parallel(
+        self, max_workers: Optional[int] = None
+    ) -> Iterator[Tuple[Path, Optional[Path]]]:
+        """Traite tous les fichiers images d'un répertoire en parallèle.
+
+        Chaque image passe l'essentiel de son temps en E/S (ouverture,
+        hachage, copie) : un pool de threads recouvre les lectures disque
+        et le hachage au lieu de les sérialiser.
+
+        Args:
+            max_workers: Nombre de threads (par défaut: app.max_workers
+                de la configuration)
+
+        Yields:
+            Tuples (chemin_original, nouveau_chemin) pour chaque image
+            traitée, dans l'ordre d'achèvement
+        """
+        if max_workers is None:
+            max_workers = get_config().get("app.max_workers", os.cpu_count() or 4)
+
+        logger.info(
+            f"Traitement parallèle du répertoire: {self.input_dir} "
+            f"({max_workers} threads)"
+        )
+
+        paths = list(self._iter_files())
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.process_image, p) for p in paths]
+            for future in as_completed(futures):
+                result = future.result()
+                if result:
+                    yield result
+
+    def process_directory_processes(
+        self, max_workers: Optional[int] = None, chunksize: int = 32
+    ) -> Iterator[Tuple[Path, Optional[Path]]]:
+        """Traite tous les fichiers images d'un répertoire via un pool de processus.
+
+        Contrairement au pool de threads, chaque worker dispose de son
+        propre interpréteur : le hachage s'exécute sur tous les cœurs
+        sans contention de GIL. Les chemins sont envoyés par lots
+        (chunksize) pour amortir le coût de sérialisation.
+
+        Args:
+            max_workers: Nombre de processus (par défaut: app.max_workers
+                de la configuration)
+            chunksize: Nombre de chemins par lot envoyé à chaque worker
+
+        Yields:
+            Tuples (chemin_original, nouveau_chemin) pour chaque image
+            traitée, dans l'ordre des fichiers parcourus
+        """
+        if max_workers is None:
+            max_workers = get_config().get("app.max_workers", os.cpu_count() or 4)
+
+        logger.info(
+            f"Traitement multi-processus du répertoire: {self.input_dir} "
+            f"({max_workers} processus)"
+        )
+
+        paths = [str(p) for p in self._iter_files()]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for result in executor.map(
+                _process_path_in_worker,
+                repeat(str(self.input_dir)),
+                repeat(str(self.output_dir)),
+                paths,
+                chunksize=chunksize,
+            ):
                 if result:
                     yield result
 
@@ -2,16 +2,26 @@
 
 import json
 import os
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional, TypeVar, Union
 import logging
 
+try:
+    import tomllib
+except ImportError:  # pragma: no cover - Python < 3.11
+    tomllib = None  # type: ignore[assignment]
+
 # Type générique pour la méthode get
 T = TypeVar("T")
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
 
+# Sentinelle pour distinguer "clé absente" d'une valeur None mémorisée
+_MISSING = object()
+
 
 def _get_config_dir() -> Path:
     """Retourne le répertoire de configuration.
@@ -38,9 +48,15 @@ def _get_config_file() -> Path:
 
 
 # Configuration par défaut
+@lru_cache(maxsize=1)
 def get_default_config() -> dict:
     """Retourne la configuration par défaut.
 
+    Le résultat est mémorisé : Path.home(), Path.cwd() et la résolution
+    du répertoire de configuration ne sont évalués qu'une seule fois.
+    Les appelants qui modifient le dictionnaire doivent d'abord le
+    copier (load() fait une copie profonde).
+
     Returns:
         Dictionnaire contenant la configuration par défaut
     """
@@ -57,6 +73,7 @@ def get_default_config() -> dict:
         },
         "processing": {
             "hash_algorithm": "sha256",
+            "link_mode": "hardlink",
             "supported_extensions": [
                 "jpg",
                 "jpeg",
@@ -106,6 +123,8 @@ class Config:
             return
 
         self._config = {}
+        self._get_cache: Dict[str, Any] = {}
+        self._dirty = False
         self._initialized = True
         self.load()
 
@@ -118,40 +137,58 @@ class Config:
         Returns:
             True si le chargement a réussi, False sinon
         """
-        config_file = config_file or _get_config_file()
+        if config_file is None:
+            config_file = _get_config_file()
+            # Un config.toml présent à côté du config.json par défaut est
+            # utilisé en priorité s'il est seul
+            toml_file = config_file.with_suffix(".toml")
+            if not config_file.exists() and toml_file.exists():
+                config_file = toml_file
 
         # Créer le dossier de configuration s'il n'existe pas
         config_dir = _get_config_dir()
         config_dir.mkdir(parents=True, exist_ok=True)
 
-        # Charger la configuration par défaut
-        self._config = self._deep_copy_config(DEFAULT_CONFIG)
+        # La configuration va changer : invalider les lectures mémorisées
+        self._get_cache.clear()
+
+        # Charger la configuration par défaut (une seule copie profonde,
+        # réutilisée tel quel dans tous les cas de figure)
+        self._config = deepcopy(DEFAULT_CONFIG)
 
         # Si le fichier de configuration existe, le charger
         if config_file.exists():
             try:
-                with open(config_file, "r", encoding="utf-8") as f:
-                    user_config = json.load(f)
-                    if not isinstance(user_config, dict):
+                # Lecture en un seul appel puis décodage en mémoire
+                raw = config_file.read_bytes()
+                if config_file.suffix == ".toml":
+                    if tomllib is None:
                         logger.error(
-                            f"Fichier {config_file} ne contient pas "
-                            "un objet JSON valide"
+                            f"Lecture de {config_file} impossible: "
+                            "tomllib requiert Python 3.11+"
                         )
                         return False
-                    self._config = self._deep_copy_config(DEFAULT_CONFIG)
-                    self._merge_configs(self._config, user_config)
-                    logger.info(f"Configuration chargée depuis {config_file}")
-                    return True
+                    user_config = tomllib.loads(raw.decode("utf-8"))
+                else:
+                    user_config = json.loads(raw)
+                if not isinstance(user_config, dict):
+                    logger.error(
+                        f"Fichier {config_file} ne contient pas "
+                        "un objet JSON valide"
+                    )
+                    return False
+                self._merge_configs(self._config, user_config)
+                logger.info(f"Configuration chargée depuis {config_file}")
+                return True
             except json.JSONDecodeError as e:
                 logger.error(f"Erreur de décodage JSON dans {config_file}: {str(e)}")
             except Exception as e:
                 logger.error(f"Erreur lors du chargement de {config_file}: {str(e)}")
-            # En cas d'erreur, charger la configuration par défaut
-            self._config = self._deep_copy_config(DEFAULT_CONFIG)
+            # En cas d'erreur, revenir à la configuration par défaut
+            self._config = deepcopy(DEFAULT_CONFIG)
             return False
 
         # Si le fichier n'existe pas, sauvegarder la configuration par défaut
-        self._config = self._deep_copy_config(DEFAULT_CONFIG)
         self.save(config_file)
         return True
 
@@ -171,9 +208,12 @@ class Config:
             config_dir = config_file.parent
             config_dir.mkdir(parents=True, exist_ok=True)
 
-            with open(config_file, "w", encoding="utf-8") as f:
-                json.dump(self._config, f, indent=2, ensure_ascii=False)
+            # Sérialisation en un bloc puis écriture unique, plutôt que
+            # des écritures au fil de l'eau par json.dump
+            data = json.dumps(self._config, indent=2, ensure_ascii=False)
+            config_file.write_text(data, encoding="utf-8")
 
+            self._dirty = False
             logger.debug(f"Configuration sauvegardée dans {config_file}")
             return True
 
@@ -196,6 +236,12 @@ class Config:
             >>> config = Config()
             >>> version = config.get('app.version', '0.0.0')
         """
+        # Lecture mémorisée : un seul hachage du chemin pointé au lieu
+        # d'un découpage + parcours du dictionnaire à chaque appel
+        cached = self._get_cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
         keys = key.split(".")
         value: Any = self._config
 
@@ -204,6 +250,7 @@ class Config:
                 if not isinstance(value, dict) or k not in value:
                     return default
                 value = value[k]
+            self._get_cache[key] = value
             return value
         except (KeyError, TypeError, AttributeError):
             return default
@@ -226,6 +273,10 @@ class Config:
         keys = key.split(".")
         current: Dict[str, Any] = self._config
 
+        # Invalider les lectures mémorisées (la clé modifiée peut être un
+        # préfixe ou un suffixe d'entrées existantes)
+        self._get_cache.clear()
+
         try:
             # Parcourir tous les niveaux sauf le dernier
             for k in keys[:-1]:
@@ -235,45 +286,37 @@ class Config:
 
             # Définir la valeur finale
             current[keys[-1]] = value
+            self._dirty = True
             return True
 
         except (KeyError, TypeError, AttributeError) as e:
             logger.error(f"Erreur lors de la définition de la clé {key}: {str(e)}")
             return True
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Retourne la configuration sous forme de dictionnaire.
-
-        Returns:
-            Dictionnaire contenant toute la configuration
-        """
-        return self._deep_copy_config(self._config)
+    def flush(self, config_file: Optional[Path] = None) -> bool:
+        """Sauvegarde la configuration uniquement si elle a été modifiée.
 
-    def _deep_copy_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Crée une copie profonde d'un dictionnaire de configuration.
+        Permet d'enchaîner les set() sans écrire sur disque à chaque
+        appel : une seule écriture a lieu, au moment choisi par
+        l'appelant (typiquement en fin de traitement).
 
         Args:
-            config: Configuration à copier (doit être un dictionnaire)
+            config_file: Chemin vers le fichier de configuration (optionnel)
 
         Returns:
-            Nouvelle copie de la configuration
+            True si rien n'était à écrire ou si la sauvegarde a réussi
+        """
+        if not self._dirty:
+            return True
+        return self.save(config_file)
 
-        Example:
-            >>> config = Config()
-            >>> copy = config._deep_copy_config({'a': 1, 'b': {'c': 2}})
+    def to_dict(self) -> Dict[str, Any]:
+        """Retourne la configuration sous forme de dictionnaire.
+
+        Returns:
+            Dictionnaire contenant toute la configuration
         """
-        result: Dict[str, Any] = {}
-        for k, v in config.items():
-            if isinstance(v, dict):
-                result[str(k)] = self._deep_copy_config(v)
-            elif isinstance(v, list):
-                result[str(k)] = [
-                    self._deep_copy_config(item) if isinstance(item, dict) else item
-                    for item in v
-                ]
-            else:
-                result[str(k)] = v
-        return result
+        return deepcopy(self._config)
 
     def _merge_configs(self, base: Dict[str, Any], update: Dict[str, Any]) -> None:
         """Fusionne récursivement deux dictionnaires de configuration.
@@ -288,13 +331,14 @@ class Config:
             else:
                 # Ne pas essayer de copier les types non-dictionnaires
                 if isinstance(value, dict):
-                    base[key] = self._deep_copy_config(value)
+                    base[key] = deepcopy(value)
                 else:
                     base[key] = value
 
 
-# Instance globale de configuration
-config = Config()
+# Instance globale de configuration (créée à la première utilisation,
+# pour que l'import du module ne touche pas le disque)
+_config: Optional[Config] = None
 
 
 def get_config() -> Config:
@@ -303,4 +347,14 @@ def get_config() -> Config:
     Returns:
         Instance de la classe Config
     """
-    return config
+    global _config
+    if _config is None:
+        _config = Config()
+    return _config
+
+
+def __getattr__(name: str) -> Any:
+    """Expose paresseusement l'attribut historique `config` (PEP 562)."""
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,13 +1,77 @@
 """Module de validation pour Fluxgym-coach."""
 
 import logging
+import os
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Union, TypeVar, Type, cast
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy est optionnel
+    np = None  # type: ignore[assignment]
+
 # Configuration du logging
 logger = logging.getLogger(__name__)
 
+# Taille à partir de laquelle la vérification de type numérique passe
+# par numpy plutôt que par une boucle isinstance élément par élément
+_NUMPY_CHECK_THRESHOLD = 64
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> "re.Pattern[str]":
+    """Compile et mémorise un modèle regex.
+
+    Le cache interne du module re est petit (~512 entrées) et partagé
+    avec tout le processus : un cache dédié garantit que les modèles de
+    validation ne sont jamais recompilés.
+
+    Args:
+        pattern: Modèle regex sous forme de chaîne
+
+    Returns:
+        Le modèle compilé
+    """
+    return re.compile(pattern)
+
+
+# Formes textuelles reconnues par validate_boolean : ensembles figés au
+# niveau du module, testés en O(1) sans reconstruction à chaque appel
+_TRUE_STRINGS = frozenset({"true", "t", "yes", "y", "1", "oui", "o", "on"})
+_FALSE_STRINGS = frozenset({"false", "f", "no", "n", "0", "non", "off"})
+
+# Nombres magiques des formats d'image supportés : préfixe -> extensions
+# correspondantes. Suffit à rejeter un non-image sans décoder le flux.
+_MAGIC_EXTENSIONS = {
+    b"\x89PNG\r\n\x1a\n": frozenset({"png"}),
+    b"\xff\xd8\xff": frozenset({"jpg", "jpeg"}),
+    b"GIF8": frozenset({"gif"}),
+    b"BM": frozenset({"bmp"}),
+    b"II*\x00": frozenset({"tiff"}),
+    b"MM\x00*": frozenset({"tiff"}),
+}
+
+
+def _sniff_image_extensions(head: bytes) -> Optional[frozenset]:
+    """Identifie le format d'image d'après les premiers octets.
+
+    Args:
+        head: Premiers octets du fichier (16 suffisent)
+
+    Returns:
+        Les extensions correspondant au format détecté, ou None si
+        aucun format supporté n'est reconnu
+    """
+    # WebP : conteneur RIFF avec la balise de format en position 8
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return frozenset({"webp"})
+    for magic, extensions in _MAGIC_EXTENSIONS.items():
+        if head.startswith(magic):
+            return extensions
+    return None
+
 
 class ValidationError(ValueError):
     """Exception levée lors de la validation des données."""
@@ -56,6 +120,7 @@ def validate_path(
     is_file: bool = False,
     must_be_file: Optional[bool] = None,
     must_be_dir: Optional[bool] = None,
+    resolve: bool = False,
 ) -> Path:
     """Valide un chemin de fichier ou de répertoire.
 
@@ -64,6 +129,9 @@ def validate_path(
         must_exist: Si True, le chemin doit exister
         create_if_missing: Si True, crée le répertoire s'il n'existe pas
         is_file: Si True, le chemin doit être un fichier
+        resolve: Si True, canonicalise le chemin (résolution des liens
+            symboliques, un stat() par composant) ; sinon le chemin est
+            simplement rendu absolu, sans appel système
 
     Returns:
         Path: Objet Path validé
@@ -80,7 +148,8 @@ def validate_path(
     elif must_be_dir is not None:
         is_file = not must_be_dir
 
-    path_obj = Path(str(path)).expanduser().resolve()
+    p = Path(str(path)).expanduser()
+    path_obj = p.resolve() if resolve else p.absolute()
 
     if not must_exist and not create_if_missing:
         _validate_path_type(path_obj, is_file)
@@ -99,13 +168,21 @@ def validate_image_file(
     file_path: Union[str, Path],
     allowed_extensions: Optional[Set[str]] = None,
     max_size_mb: int = 50,
+    strict: bool = False,
 ) -> Path:
     """Valide un fichier image.
 
+    Par défaut la validité est établie par les nombres magiques de
+    l'en-tête : un contrôle en microsecondes, là où img.verify()
+    parcourait tout le flux (O(taille du fichier)). Pour des entrées
+    non fiables, strict=True rétablit la vérification complète par PIL.
+
     Args:
         file_path: Chemin du fichier image
         allowed_extensions: Extensions autorisées (sans point)
         max_size_mb: Taille maximale en Mo
+        strict: Si True, décode l'en-tête complet via PIL en plus du
+            contrôle des nombres magiques
 
     Returns:
         Objet Path du fichier image validé
@@ -127,26 +204,86 @@ def validate_image_file(
             f"Extensions autorisées: {', '.join(sorted(allowed_extensions))}"
         )
 
-    # Vérifier la taille du fichier
+    # Taille et validité vérifiées sur un seul descripteur : fstat évite
+    # un stat() séparé et PIL relit l'en-tête depuis le même fichier ouvert
     max_size_bytes = max_size_mb * 1024 * 1024
-    file_size = path.stat().st_size
 
-    if file_size > max_size_bytes:
+    with open(path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+
+        if file_size > max_size_bytes:
+            raise ValidationError(
+                f"Le fichier est trop volumineux: {file_size / (1024 * 1024):.2f} MB "
+                f"(max: {max_size_mb} MB)"
+            )
+
+        # Vérifier que c'est bien une image valide : d'abord par les
+        # nombres magiques, sans décoder le flux
+        head = f.read(16)
+        sniffed = _sniff_image_extensions(head)
+        if sniffed is None:
+            raise ValidationError(
+                "Le fichier n'est pas une image valide: "
+                "en-tête non reconnu"
+            )
+        if ext not in sniffed:
+            raise ValidationError(
+                f"Le contenu du fichier ({'/'.join(sorted(sniffed))}) "
+                f"ne correspond pas à son extension ({ext})"
+            )
+
+        if strict:
+            try:
+                from PIL import Image
+
+                f.seek(0)
+                with Image.open(f) as img:
+                    img.verify()
+            except Exception as e:
+                raise ValidationError(
+                    f"Le fichier n'est pas une image valide: {str(e)}"
+                )
+
+    return path
+
+
+@lru_cache(maxsize=1024)
+def _validate_string_cached(
+    value: str,
+    name: str,
+    min_length: Optional[int],
+    max_length: Optional[int],
+    pattern: Optional[Union[str, "re.Pattern[str]"]],
+    allowed_values: Optional[tuple],
+) -> str:
+    """Variante mémorisée de validate_string (arguments hachables)."""
+    value = value.strip()
+    if min_length is not None and len(value) < min_length:
         raise ValidationError(
-            f"Le fichier est trop volumineux: {file_size / (1024 * 1024):.2f} MB "
-            f"(max: {max_size_mb} MB)"
+            f"La {name} doit contenir au moins {min_length} caractères"
         )
 
-    # Vérifier que c'est bien une image valide
-    try:
-        from PIL import Image
+    if max_length is not None and len(value) > max_length:
+        raise ValidationError(f"La {name} ne doit pas dépasser {max_length} caractères")
 
-        with Image.open(path) as img:
-            img.verify()
-    except Exception as e:
-        raise ValidationError(f"Le fichier n'est pas une image valide: {str(e)}")
+    if pattern is not None:
+        # Les modèles déjà compilés sont utilisés tels quels
+        compiled = (
+            pattern
+            if isinstance(pattern, re.Pattern)
+            else _compile_pattern(pattern)
+        )
+        if not compiled.match(value):
+            raise ValidationError(f"La {name} ne correspond pas au format attendu")
 
-    return path
+    if allowed_values is not None and value not in allowed_values:
+        raise ValidationError(
+            f"La {name} doit être l'une des valeurs suivantes: "
+            f"{', '.join(allowed_values)}"
+        )
+
+    # On s'assure que le type de retour est bien str
+    return str(value)
 
 
 def validate_string(
@@ -154,17 +291,22 @@ def validate_string(
     name: str = "chaîne",
     min_length: Optional[int] = None,
     max_length: Optional[int] = None,
-    pattern: Optional[str] = None,
+    pattern: Optional[Union[str, "re.Pattern[str]"]] = None,
     allowed_values: Optional[List[str]] = None,
 ) -> str:
     """Valide une chaîne de caractères.
 
+    Les validations réussies sont mémorisées : Streamlit relance le
+    script à chaque interaction et revalide les mêmes valeurs, qui
+    deviennent de simples recherches de dictionnaire.
+
     Args:
         value: Valeur à valider
         name: Nom du paramètre pour les messages d'erreur
         min_length: Longueur minimale (inclusive)
         max_length: Longueur maximale (inclusive)
-        pattern: Modèle regex pour la validation
+        pattern: Modèle regex pour la validation (chaîne ou modèle
+            déjà compilé)
         allowed_values: Liste des valeurs autorisées
 
     Returns:
@@ -176,26 +318,40 @@ def validate_string(
     if not isinstance(value, str):
         raise ValidationError(f"La valeur de {name} doit être une chaîne de caractères")
 
-    value = value.strip()
-    if min_length is not None and len(value) < min_length:
-        raise ValidationError(
-            f"La {name} doit contenir au moins {min_length} caractères"
-        )
+    return _validate_string_cached(
+        value,
+        name,
+        min_length,
+        max_length,
+        pattern,
+        tuple(allowed_values) if allowed_values is not None else None,
+    )
 
-    if max_length is not None and len(value) > max_length:
-        raise ValidationError(f"La {name} ne doit pas dépasser {max_length} caractères")
 
-    if pattern is not None and not re.match(pattern, value):
-        raise ValidationError(f"La {name} ne correspond pas au format attendu")
+@lru_cache(maxsize=1024)
+def _validate_integer_cached(
+    value: Any,
+    name: str,
+    min_value: Optional[int],
+    max_value: Optional[int],
+) -> int:
+    """Variante mémorisée de validate_integer (arguments hachables)."""
+    try:
+        int_value = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"La valeur de {name} doit être un nombre entier")
 
-    if allowed_values is not None and value not in allowed_values:
+    if min_value is not None and int_value < min_value:
         raise ValidationError(
-            f"La {name} doit être l'une des valeurs suivantes: "
-            f"{', '.join(allowed_values)}"
+            f"La valeur de {name} doit être supérieure ou égale à {min_value}"
         )
 
-    # On s'assure que le type de retour est bien str
-    return str(value)
+    if max_value is not None and int_value > max_value:
+        raise ValidationError(
+            f"La valeur de {name} doit être inférieure ou égale à {max_value}"
+        )
+
+    return int_value
 
 
 def validate_integer(
@@ -206,6 +362,8 @@ def validate_integer(
 ) -> int:
     """Valide un entier.
 
+    Les validations réussies sont mémorisées (voir validate_string).
+
     Args:
         value: Valeur à valider
         name: Nom du paramètre pour les messages d'erreur
@@ -219,21 +377,36 @@ def validate_integer(
         ValidationError: Si la validation échoue
     """
     try:
-        int_value = int(value)
-    except (TypeError, ValueError):
+        return _validate_integer_cached(value, name, min_value, max_value)
+    except TypeError:
+        # Valeur non hachable : elle ne peut pas être un entier
         raise ValidationError(f"La valeur de {name} doit être un nombre entier")
 
-    if min_value is not None and int_value < min_value:
+
+@lru_cache(maxsize=1024)
+def _validate_float_cached(
+    value: Any,
+    name: str,
+    min_value: Optional[float],
+    max_value: Optional[float],
+) -> float:
+    """Variante mémorisée de validate_float (arguments hachables)."""
+    try:
+        float_value = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"La valeur de {name} doit être un nombre")
+
+    if min_value is not None and float_value < min_value:
         raise ValidationError(
             f"La valeur de {name} doit être supérieure ou égale à {min_value}"
         )
 
-    if max_value is not None and int_value > max_value:
+    if max_value is not None and float_value > max_value:
         raise ValidationError(
             f"La valeur de {name} doit être inférieure ou égale à {max_value}"
         )
 
-    return int_value
+    return float_value
 
 
 def validate_float(
@@ -244,6 +417,8 @@ def validate_float(
 ) -> float:
     """Valide un nombre à virgule flottante.
 
+    Les validations réussies sont mémorisées (voir validate_string).
+
     Args:
         value: Valeur à valider
         name: Nom du paramètre pour les messages d'erreur
@@ -257,44 +432,92 @@ def validate_float(
         ValidationError: Si la validation échoue
     """
     try:
-        float_value = float(value)
-    except (TypeError, ValueError):
+        return _validate_float_cached(value, name, min_value, max_value)
+    except TypeError:
+        # Valeur non hachable : elle ne peut pas être un nombre
         raise ValidationError(f"La valeur de {name} doit être un nombre")
 
-    if min_value is not None and float_value < min_value:
-        raise ValidationError(
-            f"La valeur de {name} doit être supérieure ou égale à {min_value}"
-        )
-
-    if max_value is not None and float_value > max_value:
-        raise ValidationError(
-            f"La valeur de {name} doit être inférieure ou égale à {max_value}"
-        )
-
-    return float_value
 
+def validate_float_array(
+    values: Any,
+    name: str = "tableau",
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+) -> List[float]:
+    """Valide en bloc une séquence de nombres contre un intervalle.
 
-def validate_boolean(value: Any, name: str = "booléen") -> bool:
-    """Convertit une valeur en booléen.
+    Pour des milliers de valeurs, appeler validate_float élément par
+    élément paie le coût de l'interpréteur à chaque itération ; ici la
+    conversion et la comparaison se font en une passe vectorisée quand
+    numpy est disponible, avec retour à une boucle Python sinon.
 
     Args:
-        value: Valeur à convertir
+        values: Séquence de valeurs à valider
         name: Nom du paramètre pour les messages d'erreur
+        min_value: Valeur minimale (inclusive)
+        max_value: Valeur maximale (inclusive)
 
     Returns:
-        La valeur booléenne
+        La liste des floats validés
 
     Raises:
-        ValidationError: Si la conversion échoue
+        ValidationError: Si la validation échoue, en mentionnant
+            l'indice de la première valeur fautive
     """
-    if isinstance(value, bool):
-        return value
+    if not isinstance(values, (list, tuple)) and (
+        np is None or not isinstance(values, np.ndarray)
+    ):
+        raise ValidationError(f"La valeur de {name} doit être une liste")
 
+    if np is not None:
+        try:
+            arr = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValidationError(
+                f"Tous les éléments de {name} doivent être des nombres"
+            )
+        # Un seul balayage en C ; l'indice fautif n'est recherché que
+        # sur le chemin d'erreur
+        invalid = np.zeros(arr.shape, dtype=bool)
+        if min_value is not None:
+            invalid |= arr < min_value
+        if max_value is not None:
+            invalid |= arr > max_value
+        if invalid.any():
+            i = int(np.argmax(invalid)) + 1
+            raise ValidationError(
+                f"L'élément {i} de {name} est hors de l'intervalle "
+                f"[{min_value}, {max_value}]"
+            )
+        return arr.tolist()
+
+    result: List[float] = []
+    for i, value in enumerate(values, 1):
+        try:
+            float_value = float(value)
+        except (TypeError, ValueError):
+            raise ValidationError(
+                f"L'élément {i} de {name} doit être un nombre"
+            )
+        if (min_value is not None and float_value < min_value) or (
+            max_value is not None and float_value > max_value
+        ):
+            raise ValidationError(
+                f"L'élément {i} de {name} est hors de l'intervalle "
+                f"[{min_value}, {max_value}]"
+            )
+        result.append(float_value)
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _validate_boolean_cached(value: Any, name: str) -> bool:
+    """Variante mémorisée de validate_boolean (arguments hachables)."""
     if isinstance(value, str):
         value = value.lower().strip()
-        if value in ("true", "t", "yes", "y", "1"):
+        if value in _TRUE_STRINGS:
             return True
-        if value in ("false", "f", "no", "n", "0"):
+        if value in _FALSE_STRINGS:
             return False
 
     try:
@@ -307,6 +530,45 @@ def validate_boolean(value: Any, name: str = "booléen") -> bool:
     )
 
 
+def validate_boolean(value: Any, name: str = "booléen") -> bool:
+    """Convertit une valeur en booléen.
+
+    Les conversions réussies sont mémorisées (voir validate_string).
+
+    Args:
+        value: Valeur à convertir
+        name: Nom du paramètre pour les messages d'erreur
+
+    Returns:
+        La valeur booléenne
+
+    Raises:
+        ValidationError: Si la conversion échoue
+    """
+    if isinstance(value, bool):
+        return value
+
+    try:
+        return _validate_boolean_cached(value, name)
+    except TypeError:
+        # Valeur non hachable : elle ne peut pas être un booléen
+        raise ValidationError(
+            f"La valeur de {name} doit être un booléen " "(true/false, oui/non, 1/0)"
+        )
+
+
+def clear_validation_caches() -> None:
+    """Vide les caches de validation mémorisés.
+
+    À appeler après un rechargement de configuration si les mêmes
+    valeurs doivent être revalidées à neuf.
+    """
+    _validate_string_cached.cache_clear()
+    _validate_integer_cached.cache_clear()
+    _validate_float_cached.cache_clear()
+    _validate_boolean_cached.cache_clear()
+
+
 def validate_dict(
     value: Any,
     name: str = "dictionnaire",
@@ -373,7 +635,8 @@ def validate_list(
     if not isinstance(value, (list, tuple)):
         raise ValidationError(f"La valeur de {name} doit être une liste")
 
-    value_list = list(value)
+    # Éviter la copie quand l'entrée est déjà une liste
+    value_list = value if isinstance(value, list) else list(value)
 
     if len(value_list) < min_length:
         raise ValidationError(f"La {name} doit contenir au moins {min_length} éléments")
@@ -383,7 +646,30 @@ def validate_list(
             f"{name} ne doit pas contenir plus de {max_length} éléments"
         )
 
-    if item_type is not None:
+    if (
+        np is not None
+        and item_type in (int, float)
+        and len(value_list) > _NUMPY_CHECK_THRESHOLD
+    ):
+        # Grandes listes numériques : un seul contrôle de dtype en C
+        # remplace N isinstance interprétés
+        try:
+            arr = np.asarray(value_list)
+        except (TypeError, ValueError):
+            # Liste irrégulière ou éléments non convertibles : la boucle
+            # générique produira le message précis
+            arr = None
+        if arr is not None and arr.dtype.kind in (
+            "f" if item_type is float else "iu"
+        ):
+            return value_list
+        # dtype inattendu : la boucle générique produira le message précis
+
+    if item_type is not None and not all(
+        isinstance(item, item_type) for item in value_list
+    ):
+        # Chemin d'erreur uniquement : retrouver l'indice fautif pour un
+        # message précis, sans pénaliser le cas où tout est valide
         for i, item in enumerate(value_list, 1):
             if not isinstance(item, item_type):
                 raise ValidationError(
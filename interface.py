@@ -5,32 +5,144 @@ Permet de charger une image, générer une description, et lancer l'amélioratio
 
 import streamlit as st
 from pathlib import Path
-from PIL import Image
 import sys
 import os
-import torch
 import time
 import hashlib
 import shutil
 import io
-from datetime import datetime
-from transformers import AutoProcessor, BlipForConditionalGeneration
+
+# torch, transformers et PIL sont importés paresseusement dans les
+# fonctions qui les utilisent : le seul import de torch coûte ~1 s au
+# démarrage et des centaines de Mo de mémoire, même quand la
+# génération de légendes n'est pas sollicitée (sys.modules rend les
+# imports suivants gratuits)
 
 # Configuration des dossiers
 BASE_DIR = Path(__file__).parent.absolute()
 TEMP_DIR = BASE_DIR / 'temp_processing'
 TEMP_DIR.mkdir(exist_ok=True)
 
+# Invites fixes de description : définies une seule fois au niveau du module
+# pour pouvoir mémoriser leur tokenisation (elle ne change jamais d'une image
+# à l'autre)
+PROMPTS = {
+    "person": "Décris en détail chaque personne visible dans l'image. Pour chaque personne, indique :\n"
+              "- Âge approximatif et genre\n"
+              "- Couleur et style de cheveux\n"
+              "- Couleur des yeux et expression du visage\n"
+              "- Posture et gestes\n"
+              "- Émotion et attitude",
+    "clothes": "Décris les vêtements et accessoires de chaque personne :\n"
+               "- Type de tenue (décontractée, formelle, sportive, etc.)\n"
+               "- Couleurs et motifs\n"
+               "- Accessoires (lunettes, bijoux, chapeaux, etc.)\n"
+               "- État et style général",
+    "environment": "Décris l'environnement de l'image :\n"
+                   "- Type de lieu (intérieur/extérieur, urbain/naturel, etc.)\n"
+                   "- Éléments du décor\n"
+                   "- Éclairage et ambiance\n"
+                   "- Conditions météorologiques si visibles",
+    "action": "Décris ce qui se passe dans l'image :\n"
+              "- Actions des personnes\n"
+              "- Interactions entre les personnes ou avec des objets\n"
+              "- Activité principale\n"
+              "- Mouvement ou dynamique de la scène",
+    "visual": "Analyse les aspects visuels de l'image :\n"
+              "- Couleurs dominantes\n"
+              "- Composition et cadrage\n"
+              "- Éléments qui attirent l'attention\n"
+              "- Ambiance générale",
+    "tags": "Génère une liste de mots-clés détaillés pour cette image, en incluant :\n"
+            "1. Types de personnes (ex: homme adulte, enfant, femme âgée)\n"
+            "2. Couleurs dominantes\n"
+            "3. Émotions et expressions\n"
+            "4. Actions et activités\n"
+            "5. Éléments remarquables\n"
+            "Format de réponse : Liste les mots-clés séparés par des virgules, sans numérotation.",
+}
+
+# Tokenisations mémorisées des invites, par (processeur, appareil)
+_PROMPT_TOKENS = {}
+
+def get_batched_prompts(processor, device):
+    """Tokenise les invites fixes en un seul lot rembourré, une seule fois.
+
+    La tokenisation de ces invites d'environ 80 mots est un travail CPU
+    identique pour chaque image : la refaire à chaque appel est du pur
+    gaspillage. Le lot rembourré permet en plus de lancer toutes les
+    générations en un seul appel au modèle.
+
+    Returns:
+        Tuple (noms des invites, lot tokenisé) ; le lot contient
+        input_ids et attention_mask de forme [nb_invites, L].
+    """
+    key = (id(processor), str(device))
+    cached = _PROMPT_TOKENS.get(key)
+    if cached is None:
+        names = list(PROMPTS)
+        batch = processor.tokenizer(
+            [PROMPTS[name] for name in names],
+            return_tensors="pt",
+            padding=True,
+        ).to(device)
+        cached = (names, batch)
+        _PROMPT_TOKENS[key] = cached
+    return cached
+
 def clean_temp_dir():
     """Vide le dossier temporaire."""
-    for item in TEMP_DIR.glob('*'):
-        try:
-            if item.is_file():
-                item.unlink()
-            elif item.is_dir():
-                shutil.rmtree(item)
-        except Exception as e:
-            print(f"Erreur lors de la suppression de {item}: {e}")
+    # os.scandir renseigne le type d'entrée sans stat supplémentaire,
+    # là où glob('*') + is_file()/is_dir() coûtait un stat par test
+    with os.scandir(TEMP_DIR) as it:
+        for entry in it:
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    os.unlink(entry.path)
+                elif entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+            except OSError as e:
+                print(f"Erreur lors de la suppression de {entry.path}: {e}")
+
+@st.cache_data(show_spinner=False)
+def _ingest(file_hash: str, source_name: str, _uploaded_file) -> str:
+    """Convertit et enregistre un fichier uploadé.
+
+    Mémorisé par st.cache_data sur le hash du contenu : chaque
+    interaction avec un widget relance le script Streamlit, et sans
+    cache la conversion et l'écriture étaient refaites à chaque clic
+    pour le même upload. Le fichier lui-même est passé en _uploaded_file
+    (préfixe souligné : exclu de la clé de cache).
+
+    Retourne le chemin du fichier traité (str, pour la sérialisation du
+    cache)
+    """
+    # Nom déterministe, fonction pure du hash du contenu (pas
+    # d'horodatage) : une ré-ingestion après invalidation du cache
+    # recrée exactement le même chemin. Le nettoyage du dossier
+    # temporaire reste hors de cette fonction — le déclencher ici
+    # supprimerait des fichiers dont le chemin est encore en cache
+    filename = f"{file_hash[:12]}.png"
+    filepath = TEMP_DIR / filename
+
+    # Une seule écriture disque, sans copie intermédiaire : getbuffer()
+    # expose le tampon interne de l'upload en memoryview, et PIL décode
+    # directement depuis l'objet fichier uploadé
+    if source_name.lower().endswith('.png'):
+        with open(filepath, 'wb') as f:
+            f.write(_uploaded_file.getbuffer())
+    else:
+        from PIL import Image
+
+        _uploaded_file.seek(0)
+        img = Image.open(_uploaded_file)
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        # compress_level=1 : encodage PNG beaucoup plus rapide pour un
+        # fichier temporaire, surcoût de taille négligeable
+        img.save(filepath, 'PNG', compress_level=1)
+
+    return str(filepath)
 
 def process_uploaded_image(uploaded_file):
     """
@@ -39,35 +151,25 @@ def process_uploaded_image(uploaded_file):
     2. Crée un nom de fichier unique avec le hash
     3. Convertit en PNG si nécessaire
     4. Enregistre dans le dossier temporaire
-    
+
     Retourne le chemin du fichier traité
     """
-    # Nettoyer d'abord le dossier temporaire
-    clean_temp_dir()
-    
-    # Lire le contenu du fichier
-    file_bytes = uploaded_file.getvalue()
-    
-    # Calculer le hash du fichier
-    file_hash = hashlib.sha256(file_bytes).hexdigest()
-    
-    # Créer un nom de fichier unique avec horodatage
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{file_hash[:12]}.png"
-    filepath = TEMP_DIR / filename
-    
-    # Sauvegarder le fichier
-    with open(filepath, 'wb') as f:
-        f.write(file_bytes)
-    
-    # Si ce n'est pas un PNG, convertir
-    if not uploaded_file.name.lower().endswith('.png'):
-        from PIL import Image
-        img = Image.open(filepath)
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        img.save(filepath, 'PNG')
-    
+    # Hash calculé sur la memoryview du tampon interne : aucune copie
+    # bytes de l'upload complet (getvalue() en dupliquait le contenu).
+    # Clé de nommage locale, sans besoin cryptographique — BLAKE2b est
+    # nettement plus rapide que SHA-256 et 16 octets suffisent largement
+    # pour les 12 caractères utilisés
+    file_hash = hashlib.blake2b(
+        uploaded_file.getbuffer(), digest_size=16
+    ).hexdigest()
+    filepath = Path(_ingest(file_hash, uploaded_file.name, uploaded_file))
+    if not filepath.exists():
+        # Le fichier a été supprimé par un nettoyage du dossier
+        # temporaire (le cache st.cache_data est global au processus) :
+        # invalider le cache et ré-ingérer, le nom déterministe rend
+        # l'opération idempotente
+        _ingest.clear()
+        filepath = Path(_ingest(file_hash, uploaded_file.name, uploaded_file))
     return filepath
 
 # Ajout du dossier parent au path pour importer les modules du projet
@@ -96,6 +198,9 @@ def main():
     @st.cache_resource
     def load_image_captioning_model():
         """Charge le modèle de génération de légende d'image."""
+        import torch
+        from transformers import AutoProcessor, BlipForConditionalGeneration
+
         device = "cuda" if torch.cuda.is_available() else "cpu"
         
         try:
@@ -106,13 +211,36 @@ def main():
             # Utilisation d'un modèle BLIP standard plus stable
             model_name = "Salesforce/blip-image-captioning-base"
             
-            # Charger le processeur et le modèle
+            # Charger le processeur et le modèle ; en fp16 sur GPU, où la
+            # moitié de la bande passante et des registres suffisent
+            dtype = torch.float16 if torch.cuda.is_available() else torch.float32
             processor = AutoProcessor.from_pretrained(model_name)
-            model = BlipForConditionalGeneration.from_pretrained(model_name).to(device)
-            
+            model = BlipForConditionalGeneration.from_pretrained(
+                model_name, torch_dtype=dtype
+            ).to(device)
+
             # Désactiver le mode évaluation
             model.eval()
-            
+
+            if device == "cuda":
+                # Compilation Inductor : fusionne les noyaux du décodeur et
+                # supprime le surcoût de répartition Python par token généré
+                try:
+                    model = torch.compile(
+                        model, mode="reduce-overhead", fullgraph=False
+                    )
+                except Exception as e:
+                    print(f"torch.compile indisponible, mode eager conservé: {e}")
+            elif device == "cpu":
+                # Quantification dynamique int8 des couches linéaires :
+                # 2-3x plus rapide pour les matmuls de transformeur sur CPU
+                try:
+                    model = torch.ao.quantization.quantize_dynamic(
+                        model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                except Exception as e:
+                    print(f"Quantification int8 indisponible, modèle fp32 conservé: {e}")
+
             return processor, model, device
             
         except Exception as e:
@@ -121,87 +249,58 @@ def main():
             
     def generate_detailed_description(image, processor, model, device):
         """Génère une description détaillée avec des attributs visuels précis."""
+        import torch
+
         try:
-            # Configuration de la génération
+            # Configuration de la génération : décodage glouton — les
+            # descriptions n'ont pas besoin de recherche en faisceau, et
+            # 5 faisceaux multipliaient par 5 le coût de chaque invite.
+            # use_cache est explicite : le cache KV évite de recalculer
+            # l'attention des tokens déjà décodés.
             generation_kwargs = {
                 "max_length": 300,
-                "num_beams": 5,
+                "num_beams": 1,
                 "no_repeat_ngram_size": 2,
-                "early_stopping": True,
-                "do_sample": True,
-                "top_p": 0.95,
-                "temperature": 0.7
+                "do_sample": False,
+                "use_cache": True,
             }
             
-            # 1. Description des personnes
-            person_prompt = "Décris en détail chaque personne visible dans l'image. Pour chaque personne, indique :\n" \
-                          "- Âge approximatif et genre\n" \
-                          "- Couleur et style de cheveux\n" \
-                          "- Couleur des yeux et expression du visage\n" \
-                          "- Posture et gestes\n" \
-                          "- Émotion et attitude"
-            
-            inputs = processor(image, text=person_prompt, return_tensors="pt").to(device)
-            generated_ids = model.generate(**inputs, **generation_kwargs)
-            person_description = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-            
-            # 2. Description des vêtements et accessoires
-            clothes_prompt = "Décris les vêtements et accessoires de chaque personne :\n" \
-                           "- Type de tenue (décontractée, formelle, sportive, etc.)\n" \
-                           "- Couleurs et motifs\n" \
-                           "- Accessoires (lunettes, bijoux, chapeaux, etc.)\n" \
-                           "- État et style général"
-            
-            inputs = processor(image, text=clothes_prompt, return_tensors="pt").to(device)
-            generated_ids = model.generate(**inputs, **generation_kwargs)
-            clothes_description = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-            
-            # 3. Description de l'environnement
-            env_prompt = "Décris l'environnement de l'image :\n" \
-                       "- Type de lieu (intérieur/extérieur, urbain/naturel, etc.)\n" \
-                       "- Éléments du décor\n" \
-                       "- Éclairage et ambiance\n" \
-                       "- Conditions météorologiques si visibles"
-            
-            inputs = processor(image, text=env_prompt, return_tensors="pt").to(device)
-            generated_ids = model.generate(**inputs, **generation_kwargs)
-            env_description = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-            
-            # 4. Description des actions
-            action_prompt = "Décris ce qui se passe dans l'image :\n" \
-                          "- Actions des personnes\n" \
-                          "- Interactions entre les personnes ou avec des objets\n" \
-                          "- Activité principale\n" \
-                          "- Mouvement ou dynamique de la scène"
-            
-            inputs = processor(image, text=action_prompt, return_tensors="pt").to(device)
-            generated_ids = model.generate(**inputs, **generation_kwargs)
-            action_description = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-            
-            # 5. Analyse visuelle
-            visual_prompt = "Analyse les aspects visuels de l'image :\n" \
-                          "- Couleurs dominantes\n" \
-                          "- Composition et cadrage\n" \
-                          "- Éléments qui attirent l'attention\n" \
-                          "- Ambiance générale"
-            
-            inputs = processor(image, text=visual_prompt, return_tensors="pt").to(device)
-            generated_ids = model.generate(**inputs, **generation_kwargs)
-            visual_description = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-            
-            # Génération des tags
-            tags_prompt = "Génère une liste de mots-clés détaillés pour cette image, en incluant :\n" \
-                        "1. Types de personnes (ex: homme adulte, enfant, femme âgée)\n" \
-                        "2. Couleurs dominantes\n" \
-                        "3. Émotions et expressions\n" \
-                        "4. Actions et activités\n" \
-                        "5. Éléments remarquables\n" \
-                        "Format de réponse : Liste les mots-clés séparés par des virgules, sans numérotation."
-            
-            inputs = processor(image, text=tags_prompt, return_tensors="pt").to(device)
-            generated_ids = model.generate(**inputs, **generation_kwargs)
-            tags_text = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-            
+            # Invites tokenisées en un lot rembourré, une seule fois
+            # (mémorisées au niveau module)
+            prompt_names, prompt_batch = get_batched_prompts(processor, device)
+
+            # Les pixels ne dépendent pas de l'invite : un seul passage par
+            # l'extracteur d'images au lieu d'un par invite (convertis au
+            # dtype du modèle, fp16 sur GPU)
+            model_dtype = next(model.parameters()).dtype
+            pixel_values = processor.image_processor(
+                image, return_tensors="pt"
+            ).pixel_values.to(device, dtype=model_dtype)
+
+            # Un seul generate pour toutes les invites : les recherches en
+            # faisceau s'exécutent de front au lieu d'enchaîner un appel
+            # (et son coût de lancement) par invite. inference_mode coupe
+            # toute la comptabilité autograd.
+            pixel_values_b = pixel_values.expand(
+                len(prompt_names), -1, -1, -1
+            ).contiguous()
+            with torch.inference_mode():
+                generated_ids = model.generate(
+                    pixel_values=pixel_values_b,
+                    input_ids=prompt_batch["input_ids"],
+                    attention_mask=prompt_batch["attention_mask"],
+                    **generation_kwargs
+                )
+            texts = processor.batch_decode(generated_ids, skip_special_tokens=True)
+            descriptions = dict(zip(prompt_names, texts))
+
+            person_description = descriptions["person"]
+            clothes_description = descriptions["clothes"]
+            env_description = descriptions["environment"]
+            action_description = descriptions["action"]
+            visual_description = descriptions["visual"]
+            tags_text = descriptions["tags"]
+
             # Nettoyage et formatage
             def clean_text(text):
                 text = text.replace("Caption:", "").strip()
@@ -249,6 +348,8 @@ def main():
                 processed_path = process_uploaded_image(uploaded_file)
                 
                 # Charger l'image traitée
+                from PIL import Image
+
                 image = Image.open(processed_path)
                 
                 # Afficher les informations de traitement
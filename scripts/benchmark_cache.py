@@ -3,19 +3,51 @@
 import argparse
 import os
 import shutil
+import statistics
 import sys
 import time
+import uuid
 import random
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJSAMP_420
+
+    _turbojpeg = TurboJPEG()
+except Exception:  # pragma: no cover - turbojpeg est optionnel
+    _turbojpeg = None
+
 # Ajouter le répertoire parent au PYTHONPATH pour les imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fluxgym_coach.cli import main as fluxgym_main
 from fluxgym_coach.image_cache import ImageCache
 
+# Import anticipé des modules lourds du pipeline : leur coût d'import
+# est payé au chargement du script, pas dans la première mesure
+import fluxgym_coach.image_enhancement  # noqa: F401
+import fluxgym_coach.metadata  # noqa: F401
+
+
+@lru_cache(maxsize=4)
+def _get_font(size: int = 40) -> ImageFont.ImageFont:
+    """Charge (une seule fois par taille) la police des images de test.
+
+    Args:
+        size: Taille de la police en points
+
+    Returns:
+        Police chargée, ou police par défaut si Arial est introuvable
+    """
+    try:
+        return ImageFont.truetype("Arial.ttf", size)
+    except IOError:
+        return ImageFont.load_default()
+
 
 def create_test_image(
     width: int = 800, height: int = 600, text: str = ""
@@ -30,18 +62,20 @@ def create_test_image(
     Returns:
         Image PIL générée
     """
-    # Créer une image avec un dégradé
-    arr = np.zeros((height, width, 3), dtype=np.uint8)
-
     # Ajouter un dégradé de couleur aléatoire
     r1, g1, b1 = random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)
     r2, g2, b2 = random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)
 
-    for y in range(height):
-        r = int(r1 + (r2 - r1) * y / height)
-        g = int(g1 + (g2 - g1) * y / height)
-        b = int(b1 + (b2 - b1) * y / height)
-        arr[y, :] = [r, g, b]
+    # Dégradé calculé en une seule diffusion numpy : une rampe verticale
+    # interpolée entre les deux couleurs, étalée sur la largeur, au lieu
+    # d'une boucle Python par ligne de balayage
+    c1 = np.array([r1, g1, b1], dtype=np.float32)
+    c2 = np.array([r2, g2, b2], dtype=np.float32)
+    ramp = np.linspace(0.0, 1.0, height, endpoint=False, dtype=np.float32)[
+        :, None, None
+    ]
+    rows = ((1.0 - ramp) * c1 + ramp * c2).astype(np.uint8)
+    arr = np.ascontiguousarray(np.broadcast_to(rows, (height, width, 3)))
 
     img = Image.fromarray(arr)
 
@@ -49,11 +83,8 @@ def create_test_image(
     if text:
         try:
             draw = ImageDraw.Draw(img)
-            # Essayer d'utiliser une police par défaut
-            try:
-                font = ImageFont.truetype("Arial.ttf", 40)
-            except IOError:
-                font = ImageFont.load_default()
+            # Police analysée une fois par processus, pas une fois par image
+            font = _get_font(40)
 
             # Positionner le texte au centre
             text_bbox = draw.textbbox((0, 0), text, font=font)
@@ -62,26 +93,75 @@ def create_test_image(
             x = (width - text_width) // 2
             y = (height - text_height) // 2
 
-            # Ajouter un contour noir pour une meilleure lisibilité
-            for dx in [-2, 0, 2]:
-                for dy in [-2, 0, 2]:
-                    if dx != 0 or dy != 0:
-                        draw.text((x + dx, y + dy), text, font=font, fill="black")
-
-            # Ajouter le texte principal en blanc
-            draw.text((x, y), text, font=font, fill="white")
+            # Texte blanc avec contour noir pour une meilleure lisibilité :
+            # le stroker FreeType rend le contour en une seule passe, au
+            # lieu de 8 rastérisations décalées du même texte
+            draw.text(
+                (x, y),
+                text,
+                font=font,
+                fill="white",
+                stroke_width=2,
+                stroke_fill="black",
+            )
         except Exception as e:
             print(f"Avertissement: Impossible d'ajouter du texte à l'image: {e}")
 
     return img
 
 
-def prepare_test_environment(num_images: int, base_dir: Path) -> Path:
+def _make_one(i: int, input_dir: Path) -> Path:
+    """Construit et écrit une image de test (corps de boucle picklable).
+
+    Args:
+        i: Indice de l'image
+        input_dir: Dossier de destination
+
+    Returns:
+        Chemin de l'image écrite
+    """
+    # Graine dérivée de l'indice : la génération reste reproductible
+    # quel que soit l'ordre d'exécution des workers
+    random.seed(i)
+    img = create_test_image(
+        width=random.randint(400, 1200),
+        height=random.randint(300, 900),
+        text=f"Test Image {i:03d}",
+    )
+    img_path = input_dir / f"image_{i:04d}.jpg"
+    if _turbojpeg is not None:
+        # libjpeg-turbo encode en SIMD, 2-3x plus vite que libjpeg via
+        # Pillow ; le tampon RGB contigu de l'image est encodé tel quel
+        img_path.write_bytes(
+            _turbojpeg.encode(
+                np.asarray(img),
+                quality=90,
+                pixel_format=TJPF_RGB,
+                jpeg_subsample=TJSAMP_420,
+            )
+        )
+    else:
+        img.save(img_path, "JPEG", quality=90)
+    return img_path
+
+
+def prepare_test_environment(
+    num_images: int, base_dir: Path, unique_images: int = 0
+) -> Path:
     """Prépare un environnement de test avec des images factices.
 
+    Le benchmark a surtout besoin de N chemins d'entrée distincts ; le
+    contenu n'a pas à être unique pour exercer le chemin hash + copie.
+    Seules unique_images images sont réellement générées, le reste est
+    créé par lien dur sur ces bases. Attention : les sorties étant
+    nommées par hash de contenu, les doublons convergent vers le même
+    fichier de sortie — pertinent pour mesurer le cache, pas pour
+    compter les fichiers produits.
+
     Args:
         num_images: Nombre d'images à créer
         base_dir: Répertoire de base pour les tests
+        unique_images: Nombre d'images au contenu distinct (0 = toutes)
 
     Returns:
         Chemin vers le dossier d'entrée créé
@@ -98,18 +178,35 @@ def prepare_test_environment(num_images: int, base_dir: Path) -> Path:
     input_dir.mkdir(parents=True, exist_ok=True)
     output_dir.mkdir(exist_ok=True)
 
-    print(f"Création de {num_images} images de test dans {input_dir}...")
+    num_unique = num_images
+    if 0 < unique_images < num_images:
+        num_unique = unique_images
 
-    # Créer des images factices
-    for i in range(num_images):
-        img = create_test_image(
-            width=random.randint(400, 1200),
-            height=random.randint(300, 900),
-            text=f"Test Image {i:03d}",
-        )
+    print(
+        f"Création de {num_images} images de test dans {input_dir} "
+        f"({num_unique} contenus distincts)..."
+    )
+
+    # Créer des images factices : chaque image (dégradé numpy + encodage
+    # JPEG) est indépendante, un pool de processus occupe tous les cœurs
+    base_paths = []
+    with ProcessPoolExecutor() as executor:
+        for img_path in executor.map(
+            partial(_make_one, input_dir=input_dir), range(num_unique)
+        ):
+            base_paths.append(img_path)
+            print(f"  Créé: {img_path}")
+
+    # Les images restantes réutilisent les contenus générés : un lien
+    # dur coûte une entrée de répertoire, pas un encodage JPEG
+    for i in range(num_unique, num_images):
         img_path = input_dir / f"image_{i:04d}.jpg"
-        img.save(img_path, "JPEG", quality=90)
-        print(f"  Créé: {img_path}")
+        try:
+            os.link(base_paths[i % num_unique], img_path)
+        except OSError:
+            # Système de fichiers sans liens durs : copie classique
+            shutil.copy2(base_paths[i % num_unique], img_path)
+        print(f"  Lié: {img_path}")
 
     return input_dir
 
@@ -131,10 +228,13 @@ def run_benchmark(
     Returns:
         Temps d'exécution en secondes
     """
-    # Nettoyer le dossier de sortie
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
-    output_dir.mkdir()
+    # Chaque exécution écrit dans un dossier frais suffixé d'un jeton
+    # unique : aucun rmtree en préambule, le nettoyage est différé à la
+    # suppression unique de base_dir en fin de benchmark
+    output_dir = output_dir.with_name(
+        output_dir.name + "_" + uuid.uuid4().hex[:8]
+    )
+    output_dir.mkdir(parents=True)
 
     # Construire les arguments de ligne de commande
     args = ["--input", str(input_dir), "--output", str(output_dir), "--process", "all"]
@@ -149,10 +249,12 @@ def run_benchmark(
     if "--verbose" in args:
         args.remove("--verbose")
 
-    # Exécuter et mesurer le temps
-    start_time = time.time()
+    # Exécuter et mesurer le temps : perf_counter est monotone et offre
+    # la meilleure résolution disponible, là où time.time() subit les
+    # ajustements NTP et une granularité d'environ 15 ms sous Windows
+    start_time = time.perf_counter()
     result = fluxgym_main(args)
-    end_time = time.time()
+    end_time = time.perf_counter()
 
     if result != 0:
         print(
@@ -163,6 +265,56 @@ def run_benchmark(
     return end_time - start_time
 
 
+def _run_phase(
+    input_dir: Path,
+    base_dir: Path,
+    prefix: str,
+    runs: int,
+    use_cache: bool,
+    force_reprocess: bool,
+    parallel: bool = False,
+) -> list:
+    """Exécute les R mesures d'une configuration du benchmark.
+
+    Args:
+        input_dir: Dossier d'entrée partagé par les exécutions
+        base_dir: Répertoire de base des sorties
+        prefix: Préfixe des dossiers de sortie de la phase
+        runs: Nombre d'exécutions
+        use_cache: Si True, utilise le cache
+        force_reprocess: Si True, force le retraitement
+        parallel: Si True, lance les exécutions de front (threads)
+
+    Returns:
+        Durées mesurées, dans l'ordre des exécutions
+    """
+    output_dirs = [base_dir / f"{prefix}_{i}" for i in range(runs)]
+
+    if parallel:
+        # Chaque exécution écrit dans son propre dossier de sortie ;
+        # seul le pipeline doit être réentrant (mode opt-in pour cette
+        # raison). Les durées mesurées incluent alors la contention.
+        with ThreadPoolExecutor(max_workers=runs) as executor:
+            durations = list(
+                executor.map(
+                    lambda out: run_benchmark(
+                        input_dir, out, use_cache, force_reprocess
+                    ),
+                    output_dirs,
+                )
+            )
+        for i, duration in enumerate(durations):
+            print(f"  Exécution {i+1}/{runs}: {duration:.2f} secondes")
+        return durations
+
+    durations = []
+    for i, output_dir in enumerate(output_dirs):
+        duration = run_benchmark(input_dir, output_dir, use_cache, force_reprocess)
+        durations.append(duration)
+        print(f"  Exécution {i+1}/{runs}: {duration:.2f} secondes")
+    return durations
+
+
 def main():
     """Fonction principale du benchmark."""
     parser = argparse.ArgumentParser(
@@ -182,6 +334,23 @@ def main():
         default=3,
         help="Nombre d'exécutions pour chaque configuration (défaut: 3)",
     )
+    parser.add_argument(
+        "--unique-images",
+        type=int,
+        default=0,
+        help=(
+            "Nombre d'images au contenu réellement distinct, le reste "
+            "étant lié en dur (défaut: 0 = toutes distinctes)"
+        ),
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help=(
+            "Lancer les exécutions d'une même configuration de front "
+            "(suppose un pipeline réentrant)"
+        ),
+    )
     parser.add_argument(
         "--clean",
         action="store_true",
@@ -190,13 +359,34 @@ def main():
 
     args = parser.parse_args()
 
-    # Préparer les dossiers de test
-    base_dir = Path("benchmark_results")
+    # Préparer les dossiers de test : sur tmpfs (/dev/shm) quand il est
+    # disponible, pour que les mesures reflètent le cache et non la
+    # latence du périphérique de stockage ; surchargeable par la
+    # variable d'environnement FLUXGYM_BENCH_DIR
+    default_base = (
+        "/dev/shm/fluxgym_bench"
+        if Path("/dev/shm").is_dir()
+        else "benchmark_results"
+    )
+    base_dir = Path(os.environ.get("FLUXGYM_BENCH_DIR", default_base))
     if base_dir.exists():
         shutil.rmtree(base_dir)
     base_dir.mkdir(parents=True, exist_ok=True)
 
-    input_dir = prepare_test_environment(args.num_images, base_dir)
+    # Échauffement hors chronométrage : la première invocation du
+    # pipeline paie des coûts uniques (caches d'imports, allocateurs,
+    # polices) qui gonfleraient artificiellement le premier bucket
+    print("Échauffement du pipeline (non mesuré)...")
+    warm_dir = base_dir / "warmup"
+    warm_input = prepare_test_environment(1, warm_dir)
+    run_benchmark(
+        warm_input, warm_dir / "out", use_cache=True, force_reprocess=True
+    )
+    shutil.rmtree(warm_dir)
+
+    input_dir = prepare_test_environment(
+        args.num_images, base_dir, unique_images=args.unique_images
+    )
 
     print(
         f"Benchmark avec {args.num_images} images et {args.runs} exécutions par configuration"
@@ -212,31 +402,39 @@ def main():
 
     # Première exécution avec cache (mise en cache)
     print("\nPremière exécution avec cache (mise en cache)...")
-    for i in range(args.runs):
-        output_dir = base_dir / f"output_with_cache_first_{i}"
-        duration = run_benchmark(
-            input_dir, output_dir, use_cache=True, force_reprocess=True
-        )
-        results["Avec cache (première exécution)"].append(duration)
-        print(f"  Exécution {i+1}/{args.runs}: {duration:.2f} secondes")
+    results["Avec cache (première exécution)"] = _run_phase(
+        input_dir,
+        base_dir,
+        "output_with_cache_first",
+        args.runs,
+        use_cache=True,
+        force_reprocess=True,
+        parallel=args.parallel,
+    )
 
     # Exécutions suivantes avec cache (utilisation du cache)
     print("\nExécutions suivantes avec cache (utilisation du cache)...")
-    for i in range(args.runs):
-        output_dir = base_dir / f"output_with_cache_next_{i}"
-        duration = run_benchmark(
-            input_dir, output_dir, use_cache=True, force_reprocess=False
-        )
-        results["Avec cache (exécutions suivantes)"].append(duration)
-        print(f"  Exécution {i+1}/{args.runs}: {duration:.2f} secondes")
+    results["Avec cache (exécutions suivantes)"] = _run_phase(
+        input_dir,
+        base_dir,
+        "output_with_cache_next",
+        args.runs,
+        use_cache=True,
+        force_reprocess=False,
+        parallel=args.parallel,
+    )
 
     # Exécutions sans cache
     print("\nExécutions sans cache...")
-    for i in range(args.runs):
-        output_dir = base_dir / f"output_without_cache_{i}"
-        duration = run_benchmark(input_dir, output_dir, use_cache=False)
-        results["Sans cache"].append(duration)
-        print(f"  Exécution {i+1}/{args.runs}: {duration:.2f} secondes")
+    results["Sans cache"] = _run_phase(
+        input_dir,
+        base_dir,
+        "output_without_cache",
+        args.runs,
+        use_cache=False,
+        force_reprocess=False,
+        parallel=args.parallel,
+    )
 
     # Afficher les résultats de manière plus lisible
     print("\n" + "=" * 80)
@@ -253,12 +451,14 @@ def main():
         if not times:
             continue
 
-        avg = sum(times) / len(times)
-        min_time = min(times)
-        max_time = max(times)
-        std_dev = (sum((t - avg) ** 2 for t in times) / len(times)) ** 0.5
-
-        stats[config] = {"avg": avg, "min": min_time, "max": max_time, "std": std_dev}
+        # statistics.fmean et pstdev sont implémentés en C : une seule
+        # passe au lieu des traversées Python sum + compréhension
+        stats[config] = {
+            "avg": statistics.fmean(times),
+            "min": min(times),
+            "max": max(times),
+            "std": statistics.pstdev(times),
+        }
 
     # Afficher le tableau des résultats
     print("\n" + "-" * 80)
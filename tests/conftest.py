@@ -1,10 +1,7 @@
 """Configuration des tests pour Fluxgym-coach."""
 
-import os
-import shutil
-import tempfile
 from pathlib import Path
-from typing import Dict, Generator
+from typing import Dict
 
 import pytest
 
@@ -17,26 +14,29 @@ def test_version():
 
 
 @pytest.fixture(scope="function")
-def temp_dir() -> Generator[Path, None, None]:
+def temp_dir(tmp_path: Path) -> Path:
     """Crée un répertoire temporaire pour les tests.
 
-    Yields:
+    Alias du tmp_path intégré de pytest : un seul basetemp partagé,
+    sous-dossiers atomiques par test et nettoyage paresseux, au lieu
+    d'un mkdtemp + rmtree par test.
+
+    Returns:
         Chemin vers le répertoire temporaire
     """
-    temp_dir = tempfile.mkdtemp(prefix="fluxgym_test_")
-    yield Path(temp_dir)
-
-    # Nettoyer après le test
-    if os.path.exists(temp_dir):
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    return tmp_path
 
 
-@pytest.fixture(scope="function")
-def sample_image(temp_dir: Path) -> Path:
+@pytest.fixture(scope="session")
+def sample_image(tmp_path_factory: pytest.TempPathFactory) -> Path:
     """Crée une image d'exemple pour les tests.
 
+    Portée session : l'image est identique pour tous les tests et
+    aucun ne la modifie, un seul encodage PIL suffit pour toute la
+    suite.
+
     Args:
-        temp_dir: Répertoire temporaire
+        tmp_path_factory: Fabrique de répertoires temporaires pytest
 
     Returns:
         Chemin vers l'image de test
@@ -44,7 +44,7 @@ def sample_image(temp_dir: Path) -> Path:
     from PIL import Image, ImageDraw
 
     # Créer une image de test simple
-    img_path = temp_dir / "test_image.jpg"
+    img_path = tmp_path_factory.mktemp("sample_image") / "test_image.jpg"
     img = Image.new("RGB", (100, 100), color="red")
     draw = ImageDraw.Draw(img)
     draw.text((10, 10), "Test Image", fill="white")
@@ -53,19 +53,22 @@ def sample_image(temp_dir: Path) -> Path:
     return img_path
 
 
-@pytest.fixture(scope="function")
-def sample_image_with_metadata(temp_dir: Path) -> Path:
+@pytest.fixture(scope="session")
+def sample_image_with_metadata(tmp_path_factory: pytest.TempPathFactory) -> Path:
     """Crée une image avec des métadonnées EXIF pour les tests.
 
+    Portée session : la charge EXIF est une constante, l'image n'est
+    jamais modifiée par les tests (voir sample_image).
+
     Args:
-        temp_dir: Répertoire temporaire
+        tmp_path_factory: Fabrique de répertoires temporaires pytest
 
     Returns:
         Chemin vers l'image de test avec métadonnées
     """
     from PIL import Image, ImageDraw
 
-    img_path = temp_dir / "test_metadata.jpg"
+    img_path = tmp_path_factory.mktemp("sample_metadata") / "test_metadata.jpg"
     img = Image.new("RGB", (200, 200), color="blue")
     draw = ImageDraw.Draw(img)
     draw.text((20, 20), "Image avec métadonnées", fill="white")
@@ -1,12 +1,40 @@
 """Tests d'intégration de bout en bout pour Fluxgym-coach."""
 
+import os
 import shutil
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 from fluxgym_coach.cli import main as cli_main
 
 
+@pytest.fixture(autouse=True)
+def fast_pipeline(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Court-circuite les étapes lentes du pipeline quand PYTEST_FAST=1.
+
+    Ces tests valident surtout le renommage par hash et les métadonnées ;
+    la génération de descriptions et l'amélioration via l'API Stable
+    Diffusion dominent pourtant leur durée (appels réseau, délais de
+    reconnexion). Avec PYTEST_FAST=1 ces deux étapes deviennent des
+    bouchons qui déclarent chaque image traitée, sans toucher au chemin
+    hash + copie + métadonnées réellement testé. Par défaut (variable
+    absente), le pipeline complet s'exécute.
+    """
+    if os.environ.get("PYTEST_FAST") != "1":
+        return
+
+    monkeypatch.setattr(
+        "fluxgym_coach.cli.process_descriptions",
+        lambda image_files, output_dir: len(image_files),
+    )
+    monkeypatch.setattr(
+        "fluxgym_coach.image_enhancement.ImageEnhancer.upscale_image",
+        lambda self, image_path, *args, **kwargs: None,
+    )
+
+
 def test_end_to_end_processing(tmp_path: Path, sample_image: Path):
     """Teste le flux complet de traitement d'images."""
     # Créer une structure de dossiers de test
@@ -3,8 +3,6 @@
 import base64
 import io
 import json
-import os
-import tempfile
 import time
 from pathlib import Path
 from urllib.error import URLError
@@ -21,61 +19,69 @@ TEST_IMAGE_PATH = Path("tests/test_data/test_image.png")
 MOCK_API_URL = "http://localhost:9999"  # URL factice pour les tests
 
 
+def _build_mock_response() -> tuple:
+    """Construit la réponse d'API simulée (payload constant)."""
+    img = Image.new("RGB", (100, 100), color="white")
+    img_byte_arr = io.BytesIO()
+    img.save(img_byte_arr, format="PNG")
+    img_base64 = base64.b64encode(img_byte_arr.getvalue()).decode("utf-8")
+    response = {"images": [img_base64], "parameters": {}, "info": "test info"}
+    return response, json.dumps(response)
+
+
+# Encodés une seule fois au chargement du module : la réponse simulée
+# est une constante, inutile de refaire encodage PNG + base64 +
+# json.dumps à chaque instanciation de la fixture
+_MOCK_RESPONSE, _MOCK_RESPONSE_JSON = _build_mock_response()
+
+
+@pytest.fixture(scope="session")
+def tiny_png(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Petite image PNG écrite une seule fois pour toute la session.
+
+    Les tests ne font que la lire : un seul encodage PNG remplace un
+    NamedTemporaryFile + encodage + unlink par test.
+    """
+    path = tmp_path_factory.mktemp("sd_api") / "test_image.png"
+    Image.new("RGB", (100, 100), color="white").save(path, "PNG")
+    return path
+
+
 class TestStableDiffusionAPI:
     """Tests d'intégration pour l'API Stable Diffusion."""
 
     @pytest.fixture
     def mock_api_response(self):
         """Fixture pour simuler les réponses de l'API Stable Diffusion."""
-        # Création d'une image de test
-        img = Image.new("RGB", (100, 100), color="white")
-        img_byte_arr = io.BytesIO()
-        img.save(img_byte_arr, format="PNG")
-        img_base64 = base64.b64encode(img_byte_arr.getvalue()).decode("utf-8")
-
-        # Configuration de la réponse simulée
-        mock_response = {"images": [img_base64], "parameters": {}, "info": "test info"}
-
         with patch("requests.Session.send") as mock_send:
             # Configuration du mock pour simuler une réponse réussie
             mock_http_response = MagicMock()
             mock_http_response.status_code = 200
-            mock_http_response.text = json.dumps(mock_response)
-            mock_http_response.json.return_value = mock_response
+            mock_http_response.text = _MOCK_RESPONSE_JSON
+            mock_http_response.json.return_value = _MOCK_RESPONSE
             mock_send.return_value = mock_http_response
 
             yield mock_send
 
-    def test_upscale_image_success(self, mock_api_response):
+    def test_upscale_image_success(self, mock_api_response, tiny_png):
         """Test la fonction d'upscaling avec succès."""
         # Initialisation
         enhancer = ImageEnhancer(api_url=MOCK_API_URL, use_cache=False)
 
-        # Création d'un fichier image temporaire pour le test
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
-            img = Image.new("RGB", (100, 100), color="white")
-            img.save(tmp_file, format="PNG")
-            test_image_path = tmp_file.name
-
-        try:
-            # Appel de la méthode à tester
-            output_path, is_bw = enhancer.upscale_image(
-                image_path=Path(test_image_path),
-                scale_factor=2,
-                upscaler="R-ESRGAN 4x+ Anime6B",
-                denoising_strength=0.5,
-                prompt="high quality, high resolution, detailed",
-                negative_prompt="blurry, lowres, low quality",
-                steps=20,
-                cfg_scale=7.0,
-                sampler_name="DPM++ 2M",
-                output_format="PNG",
-                auto_colorize=True,
-            )
-        finally:
-            # Nettoyage
-            if os.path.exists(test_image_path):
-                os.unlink(test_image_path)
+        # Appel de la méthode à tester
+        output_path, is_bw = enhancer.upscale_image(
+            image_path=tiny_png,
+            scale_factor=2,
+            upscaler="R-ESRGAN 4x+ Anime6B",
+            denoising_strength=0.5,
+            prompt="high quality, high resolution, detailed",
+            negative_prompt="blurry, lowres, low quality",
+            steps=20,
+            cfg_scale=7.0,
+            sampler_name="DPM++ 2M",
+            output_format="PNG",
+            auto_colorize=True,
+        )
 
         # Vérifications
         assert output_path is not None
@@ -144,7 +150,7 @@ class TestStableDiffusionAPI:
         call_args = mock_api_response.call_args[0][0]
         assert "sdapi/v1/img2img" in call_args.url  # Note: corrigé de txt2img à img2img
 
-    def test_api_error_handling(self):
+    def test_api_error_handling(self, tiny_png):
         """Test la gestion des erreurs de l'API."""
         with patch("requests.Session.send") as mock_send, patch(
             "json.loads"
@@ -163,26 +169,15 @@ class TestStableDiffusionAPI:
             # Initialisation
             enhancer = ImageEnhancer(api_url=MOCK_API_URL, use_cache=False)
 
-            # Création d'un fichier image temporaire pour le test
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
-                img = Image.new("RGB", (100, 100), color="white")
-                img.save(tmp_file, format="PNG")
-                test_image_path = tmp_file.name
-
-            try:
-                # Vérification que l'exception est levée
-                with pytest.raises(URLError):
-                    enhancer.upscale_image(
-                        image_path=Path(test_image_path),
-                        scale_factor=2,
-                        upscaler="R-ESRGAN 4x+ Anime6B",
-                    )
-            finally:
-                # Nettoyage
-                if os.path.exists(test_image_path):
-                    os.unlink(test_image_path)
-
-    def test_timeout_handling(self):
+            # Vérification que l'exception est levée
+            with pytest.raises(URLError):
+                enhancer.upscale_image(
+                    image_path=tiny_png,
+                    scale_factor=2,
+                    upscaler="R-ESRGAN 4x+ Anime6B",
+                )
+
+    def test_timeout_handling(self, tiny_png):
         """Test la gestion des timeouts de l'API."""
         with patch("requests.Session.send") as mock_send, patch(
             "json.loads"
@@ -194,21 +189,10 @@ class TestStableDiffusionAPI:
             # Initialisation
             enhancer = ImageEnhancer(api_url=MOCK_API_URL, use_cache=False)
 
-            # Création d'un fichier image temporaire pour le test
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp_file:
-                img = Image.new("RGB", (100, 100), color="white")
-                img.save(tmp_file, format="PNG")
-                test_image_path = tmp_file.name
-
-            try:
-                # Vérification que l'exception est levée
-                with pytest.raises(URLError):
-                    enhancer.upscale_image(
-                        image_path=Path(test_image_path),
-                        scale_factor=2,
-                        upscaler="R-ESRGAN 4x+ Anime6B",
-                    )
-            finally:
-                # Nettoyage
-                if os.path.exists(test_image_path):
-                    os.unlink(test_image_path)
+            # Vérification que l'exception est levée
+            with pytest.raises(URLError):
+                enhancer.upscale_image(
+                    image_path=tiny_png,
+                    scale_factor=2,
+                    upscaler="R-ESRGAN 4x+ Anime6B",
+                )
@@ -5,11 +5,13 @@ Ce script permet de tester la méthode upscale_batch avec différents scénarios
 pour s'assurer que l'ordre des résultats est correctement préservé.
 """
 
+import io
 import os
 import sys
 import tempfile
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 from PIL import Image, ImageDraw
@@ -50,20 +52,20 @@ COLORS = [
 ]
 
 
-def create_test_images(
-    output_dir: Path, num_images: int = 3, size: tuple = (100, 100)
-) -> list[Path]:
-    """Crée des images de test avec des couleurs uniques."""
-    paths = []
-    os.makedirs(output_dir, exist_ok=True)
+# Octets PNG des images de test, mémorisés par (taille, couleur, texte) :
+# les tests redemandent sans cesse les mêmes combinaisons, un encodage
+# par combinaison distincte suffit et l'écriture devient un write_bytes
+_TEMPLATE_CACHE: dict = {}
 
-    for i in range(num_images):
-        color = COLORS[i % len(COLORS)]
+
+def _render_test_png(size: tuple, color: tuple, text: str) -> bytes:
+    """Rend (et mémorise) le PNG d'une image de test."""
+    key = (size, color, text)
+    cached = _TEMPLATE_CACHE.get(key)
+    if cached is None:
         img = Image.new("RGB", size, color=color)
         draw = ImageDraw.Draw(img)
 
-        # Ajouter un numéro sur l'image pour faciliter l'identification
-        text = str(i + 1)
         # Utiliser textbbox au lieu de textsize pour la compatibilité avec Pillow 10+
         bbox = draw.textbbox((0, 0), text=text)
         text_width = bbox[2] - bbox[0]
@@ -71,12 +73,30 @@ def create_test_images(
         position = ((size[0] - text_width) // 2, (size[1] - text_height) // 2)
         draw.text(position, text, fill=(0, 0, 0))
 
-        # Sauvegarder l'image
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        cached = buf.getvalue()
+        _TEMPLATE_CACHE[key] = cached
+    return cached
+
+
+def create_test_images(
+    output_dir: Path, num_images: int = 3, size: tuple = (100, 100)
+) -> list[Path]:
+    """Crée des images de test avec des couleurs uniques."""
+    os.makedirs(output_dir, exist_ok=True)
+
+    def _build(i: int) -> Path:
+        color = COLORS[i % len(COLORS)]
+        # Le numéro sur l'image facilite l'identification ; le rendu est
+        # mémorisé, l'encodage zlib et l'écriture disque relâchent le GIL
         path = output_dir / f"test_{i+1}.png"
-        img.save(path)
-        paths.append(path)
+        path.write_bytes(_render_test_png(size, color, str(i + 1)))
+        return path
 
-    return paths
+    # ex.map préserve l'ordre des chemins malgré l'écriture concurrente
+    with ThreadPoolExecutor(max_workers=min(4, num_images)) as ex:
+        return list(ex.map(_build, range(num_images)))
 
 
 @pytest.mark.xfail(reason="Problème connu avec le chemin de sortie manquant pour l'image 3. À corriger après la prochaine implémentation de fonction.")
@@ -129,12 +149,8 @@ def test_batch_processing():
         image_paths = create_test_images(temp_dir / "input", num_images=4)
 
         # Créer les répertoires de sortie
-        (output_dir / "batch1").mkdir(parents=True, exist_ok=True)
-        (output_dir / "batch2").mkdir(parents=True, exist_ok=True)
-
-        # Créer les répertoires de sortie
-        (output_dir / "batch1").mkdir(parents=True, exist_ok=True)
-        (output_dir / "batch2").mkdir(parents=True, exist_ok=True)
+        for sub in ("batch1", "batch2"):
+            (output_dir / sub).mkdir(parents=True, exist_ok=True)
 
         # Initialiser l'améliorateur d'images avec un cache
         from fluxgym_coach.image_cache import ImageCache
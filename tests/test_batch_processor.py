@@ -2,6 +2,7 @@
 
 import base64
 import io
+from functools import lru_cache
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -11,12 +12,24 @@ from PIL import Image, ImageDraw
 from fluxgym_coach.batch_processor import BatchProcessor
 
 
-def create_test_image(width=100, height=100, color=(255, 0, 0), text="Test"):
-    """Crée une image de test avec une couleur unie et du texte."""
+@lru_cache(maxsize=64)
+def _image_bytes(width, height, color, text):
+    """Rend (et mémorise) les octets PNG d'une image de test.
+
+    Les tests redemandent les mêmes combinaisons (taille, couleur,
+    texte) : la compression PNG n'est payée qu'une fois par combinaison.
+    """
     img = Image.new('RGB', (width, height), color=color)
     draw = ImageDraw.Draw(img)
     draw.text((10, 10), text, fill=(255, 255, 255))
-    return img
+    buffered = io.BytesIO()
+    img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def create_test_image(width=100, height=100, color=(255, 0, 0), text="Test"):
+    """Crée une image de test avec une couleur unie et du texte."""
+    return Image.open(io.BytesIO(_image_bytes(width, height, color, text)))
 
 
 def image_to_base64(image):
@@ -26,20 +39,40 @@ def image_to_base64(image):
     return base64.b64encode(buffered.getvalue()).decode("utf-8")
 
 
+# Réponses d'API simulées : des constantes, encodées une seule fois au
+# chargement du module plutôt qu'à chaque exécution du test
+_IMG_200_RED_B64 = image_to_base64(
+    create_test_image(width=200, height=200, color=(255, 0, 0))
+)
+_IMG_300_BLUE_B64 = image_to_base64(
+    create_test_image(width=300, height=300, color=(0, 0, 255))
+)
+
+
 class TestBatchProcessor:
     """Tests pour la classe BatchProcessor."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def batch_processor(self):
-        """Instance de BatchProcessor pour les tests."""
+        """Instance de BatchProcessor pour les tests.
+
+        Portée module : l'instance ne porte que l'URL de l'API, aucun
+        état mutable, une seule construction suffit pour la classe.
+        """
         return BatchProcessor(api_url="http://test-server:7860")
 
-    @pytest.fixture
-    def test_images(self, tmp_path):
-        """Crée des images de test et retourne leurs chemins."""
-        img1_path = tmp_path / "test1.png"
-        img2_path = tmp_path / "test2.png"
-        
+    @pytest.fixture(scope="module")
+    def test_images(self, tmp_path_factory):
+        """Crée des images de test et retourne leurs chemins.
+
+        Portée module : les images d'entrée ne sont jamais modifiées par
+        les tests, un seul encodage PNG + écriture disque suffit. Les
+        sorties restent dans le tmp_path par test, jamais ici.
+        """
+        input_dir = tmp_path_factory.mktemp("batch_imgs")
+        img1_path = input_dir / "test1.png"
+        img2_path = input_dir / "test2.png"
+
         # Créer deux images différentes
         img1 = create_test_image(color=(255, 0, 0), text="Image 1")
         img2 = create_test_image(color=(0, 0, 255), text="Image 2")
@@ -94,10 +127,7 @@ class TestBatchProcessor:
         # Préparer la réponse simulée de l'API avec des images de sortie agrandies
         mock_response = MagicMock()
         mock_response.json.return_value = {
-            "images": [
-                image_to_base64(create_test_image(width=200, height=200, color=(255, 0, 0))),
-                image_to_base64(create_test_image(width=300, height=300, color=(0, 0, 255)))
-            ],
+            "images": [_IMG_200_RED_B64, _IMG_300_BLUE_B64],
             "parameters": {}
         }
         mock_response.raise_for_status.return_value = None
@@ -292,7 +292,7 @@ def test_preprocess_image_variations(temp_image, temp_bw_image, tmp_path):
 
 def test_call_api_connection_error():
     """Teste la gestion des erreurs de connexion dans _call_api."""
-    with patch("fluxgym_coach.image_enhancement.requests.post") as mock_post:
+    with patch("fluxgym_coach.image_enhancement.requests.Session.post") as mock_post:
         # Configurer le mock pour simuler une erreur de connexion
         mock_post.side_effect = requests.exceptions.RequestException(
             "Erreur de connexion"
@@ -309,7 +309,7 @@ def test_call_api_connection_error():
 
 def test_call_api_http_404_error():
     """Teste la gestion des erreurs HTTP 404 dans _call_api."""
-    with patch("fluxgym_coach.image_enhancement.requests.post") as mock_post, patch(
+    with patch("fluxgym_coach.image_enhancement.requests.Session.post") as mock_post, patch(
         "fluxgym_coach.image_enhancement.time.sleep"
     ) as mock_sleep:
         # Créer un mock de réponse avec un statut 404
@@ -346,7 +346,7 @@ def test_call_api_http_404_error():
 
 def test_call_api_invalid_json():
     """Teste la gestion des réponses JSON invalides dans _call_api."""
-    with patch("fluxgym_coach.image_enhancement.requests.post") as mock_post:
+    with patch("fluxgym_coach.image_enhancement.requests.Session.post") as mock_post:
         # Créer un mock de réponse avec du JSON invalide
         mock_response = MagicMock()
         mock_response.status_code = 200
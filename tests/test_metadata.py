@@ -115,6 +115,26 @@ def test_extract_and_save_metadata(sample_image: Path, temp_dir: Path):
     assert saved_metadata["content_hash"] in metadata["content_hash"]
 
 
+def test_dedup_scan(sample_image: Path, temp_dir: Path):
+    """Teste le regroupement par contenu identique de dedup_scan."""
+    extractor = MetadataExtractor(temp_dir)
+
+    # Deux copies identiques et un fichier au contenu distinct
+    duplicate = temp_dir / "copie.jpg"
+    shutil.copy2(sample_image, duplicate)
+    distinct = temp_dir / "distinct.bin"
+    distinct.write_bytes(b"contenu different")
+
+    groups = extractor.dedup_scan([sample_image, duplicate, distinct])
+
+    # Les deux copies doivent partager le même groupe, le fichier distinct
+    # doit être seul dans le sien
+    grouped_paths = sorted(groups.values(), key=len, reverse=True)
+    assert len(groups) == 2
+    assert sorted(grouped_paths[0]) == sorted([sample_image, duplicate])
+    assert grouped_paths[1] == [distinct]
+
+
 def test_process_metadata_function(sample_image: Path, temp_dir: Path):
     """Teste la fonction process_metadata avec déduplication basée sur le hachage."""
     # Créer une structure de dossiers de test
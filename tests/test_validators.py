@@ -9,6 +9,7 @@ from fluxgym_coach.utils.validators import (
     validate_string,
     validate_integer,
     validate_float,
+    validate_float_array,
     validate_boolean,
     validate_dict,
     validate_list,
@@ -136,6 +137,24 @@ def test_validate_float():
         validate_float(3.5, "test", max_value=3.0)
 
 
+def test_validate_float_array():
+    """Teste la validation en bloc d'une séquence de nombres."""
+    # Test basique
+    assert validate_float_array([1, 2.5, "3"], "test") == [1.0, 2.5, 3.0]
+
+    # Test de type invalide
+    with pytest.raises(ValidationError):
+        validate_float_array("not a list", "test")
+    with pytest.raises(ValidationError):
+        validate_float_array([1.0, "not a number"], "test")
+
+    # Test des bornes (le message mentionne l'indice fautif)
+    with pytest.raises(ValidationError, match="élément 2"):
+        validate_float_array([1.0, 2.5], "test", max_value=2.0)
+    with pytest.raises(ValidationError, match="élément 1"):
+        validate_float_array([0.5, 1.0], "test", min_value=1.0)
+
+
 def test_validate_boolean():
     """Teste la validation des booléens."""
     # Test des valeurs vraies